@@ -5,6 +5,7 @@ from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 from enum import Enum
 import json
+import numpy as np
 
 class ExtractionMethod(Enum):
     """抽出方法"""
@@ -163,12 +164,16 @@ class AnalysisResult:
         if not self.extracted_data:
             return
         
-        confidences = [result.confidence for result in self.extracted_data.values()]
-        high_conf_count = sum(1 for c in confidences if c >= 0.8)
+        confidences = np.fromiter(
+            (result.confidence for result in self.extracted_data.values()),
+            dtype=np.float64,
+            count=len(self.extracted_data)
+        )
+        high_conf_count = int((confidences >= 0.8).sum())
         valid_count = sum(1 for result in self.extracted_data.values() if result.is_valid)
         
         self.quality_metrics = QualityMetrics(
-            overall_confidence=sum(confidences) / len(confidences),
+            overall_confidence=float(confidences.mean()),
             high_confidence_fields=high_conf_count,
             total_fields=len(self.extracted_data),
             extraction_completeness=1.0,  # 実装では期待フィールド数と比較
@@ -2,13 +2,137 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 import logging
 import traceback
 import sys
-from typing import Dict, List, Any, Optional, Tuple
+import os
+import io
+import json
+import hashlib
+from typing import Dict, List, Any, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime
 from pathlib import Path
+from PIL import Image
+from src.utils.config import SystemConfig
+from streamlit.runtime.uploaded_file_manager import UploadedFile
+
+# 高速JSONシリアライザの確認
+try:
+    import orjson
+    ORJSON_SUPPORT = True
+except ImportError:
+    ORJSON_SUPPORT = False
+
+# 重いモジュール（データベース・エージェント）は使用時に読み込む
+if TYPE_CHECKING:
+    from src.core.agent import DrawingAnalysisAgent
+    from src.utils.database import DatabaseManager
+
+@st.cache_resource(show_spinner=False)
+def get_db_manager(db_path: str) -> 'DatabaseManager':
+    """データベース管理クラスを取得（DBパスごとに全ページ・再実行間で共有）"""
+    from src.utils.database import DatabaseManager
+    return DatabaseManager(db_path)
+
+def agent_config_key(config: SystemConfig) -> tuple:
+    """エージェントの共有単位となる設定値（APIキーとDBパス）"""
+    return (config.get('openai.api_key'), config.get('database.path'))
+
+@st.cache_resource(show_spinner=False, hash_funcs={SystemConfig: agent_config_key})
+def get_agent(config: SystemConfig) -> 'DrawingAnalysisAgent':
+    """解析エージェントを取得（APIキーとDBパスが同じ間は全ページで共有）"""
+    from src.core.agent import create_agent_from_config
+    return create_agent_from_config(config)
+
+@st.cache_data(max_entries=32)
+def _build_stage_times_df(stage_times: Tuple[Tuple[str, float], ...]) -> pd.DataFrame:
+    """処理段階別時間のデータフレームを作成（入力が同じ場合は再利用）"""
+    return pd.DataFrame({
+        '処理段階': [stage for stage, _ in stage_times],
+        '処理時間(秒)': [seconds for _, seconds in stage_times]
+    })
+
+# プレビュー画像の最大サイズ（長辺ピクセル）
+PREVIEW_MAX_SIZE = (1600, 1600)
+
+# 時系列チャートに描画する最大点数
+MAX_TIME_SERIES_POINTS = 2000
+
+# この点数を超える場合はWebGL（Scattergl）で描画
+WEBGL_POINT_THRESHOLD = 1000
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets法で間引き後に残す点のインデックスを取得"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    bucket_size = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        
+        # 次のバケットの平均点
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        
+        # 前回選択点・平均点と作る三角形の面積が最大の点を選択
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(areas.argmax())
+        indices[i + 1] = a
+    
+    return indices
+
+def _uploaded_file_key(uploaded_file: UploadedFile) -> Tuple[str, bytes]:
+    """アップロードファイルのキャッシュキー（名前と内容全体のハッシュ）"""
+    return (
+        uploaded_file.name,
+        hashlib.blake2b(uploaded_file.getbuffer(), digest_size=16).digest()
+    )
+
+@st.cache_resource(max_entries=8, hash_funcs={UploadedFile: _uploaded_file_key})
+def _load_preview_image(uploaded_file: UploadedFile) -> Tuple[Dict[str, str], Image.Image]:
+    """画像メタデータとプレビュー画像を読み込み（同じファイルの場合は再利用）"""
+    uploaded_file.seek(0)
+    preview_image = Image.open(uploaded_file)
+    metadata = {
+        "解像度": f"{preview_image.width} x {preview_image.height}",
+        "カラーモード": preview_image.mode
+    }
+    # JPEGはプレビュー用に縮小スケールでデコードし、最大サイズに収める
+    preview_image.draft('RGB', PREVIEW_MAX_SIZE)
+    preview_image.thumbnail(PREVIEW_MAX_SIZE, Image.LANCZOS)
+    return metadata, preview_image
+
+@st.cache_data(ttl=5, show_spinner=False)
+def existing_children(parent: str) -> frozenset:
+    """ディレクトリ直下のエントリ名一覧を取得（5秒間は結果を再利用）"""
+    try:
+        with os.scandir(parent) as it:
+            return frozenset(entry.name for entry in it)
+    except OSError:
+        return frozenset()
+
+def path_exists(path) -> bool:
+    """パスの存在を親ディレクトリのエントリ名一覧から判定
+    
+    一覧に見つからない場合（'.'・'/'などの特殊なパス、親ディレクトリが読めない場合、
+    大文字小文字を区別しないファイルシステム）はos.path.existsで確認する。
+    """
+    parent, name = os.path.split(os.path.normpath(str(path)))
+    return name in existing_children(parent or '.') or os.path.exists(path)
 
 class NotificationManager:
     """通知管理クラス"""
@@ -59,30 +183,27 @@ class MetricsDisplay:
             field_count = len(metrics_data.get('extracted_data', {}))
             st.metric("抽出フィールド", field_count)
         
-        # 詳細メトリクス
+        # 詳細メトリクス（開閉はブラウザ側で行われるため再実行を伴わない）
         if 'processing_metrics' in metrics_data:
             with st.expander("詳細メトリクス", expanded=False):
                 proc_metrics = metrics_data['processing_metrics']
                 
                 st.markdown("### 処理段階別時間")
                 
-                detail_data = {
-                    "前処理": proc_metrics.get('image_preprocessing_time', 0),
-                    "AI解析": proc_metrics.get('ai_analysis_time', 0),
-                    "後処理": proc_metrics.get('post_processing_time', 0)
-                }
+                stage_times = (
+                    ("前処理", proc_metrics.get('image_preprocessing_time', 0)),
+                    ("AI解析", proc_metrics.get('ai_analysis_time', 0)),
+                    ("後処理", proc_metrics.get('post_processing_time', 0))
+                )
                 
                 # 棒グラフ
-                df = pd.DataFrame({
-                    '処理段階': list(detail_data.keys()),
-                    '処理時間(秒)': list(detail_data.values())
-                })
+                df = _build_stage_times_df(stage_times)
                 
-                fig = px.bar(
-                    df, 
-                    x='処理段階', 
-                    y='処理時間(秒)',
-                    title="処理段階別時間"
+                fig = go.Figure(go.Bar(x=df['処理段階'], y=df['処理時間(秒)']))
+                fig.update_layout(
+                    title="処理段階別時間",
+                    xaxis_title='処理段階',
+                    yaxis_title='処理時間(秒)'
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
@@ -108,15 +229,28 @@ class FileUploader:
                 "ファイルサイズ": f"{uploaded_file.size / 1024:.1f} KB"
             }
             
+            # 画像は一度だけデコードし、メタデータとプレビューで共用する
+            is_image = uploaded_file.type.startswith('image')
+            if is_image:
+                metadata, _ = _load_preview_image(uploaded_file)
+                file_details.update(metadata)
+            
             st.json(file_details)
             
             # 画像プレビュー
-            if uploaded_file.type.startswith('image'):
-                st.image(uploaded_file, caption="アップロードされた図面", use_column_width=True)
+            if is_image:
+                FileUploader.show_image_preview(uploaded_file)
             
             return uploaded_file.name, uploaded_file.getvalue()
         
         return None
+    
+    @staticmethod
+    def show_image_preview(uploaded_file: UploadedFile, caption: str = "アップロードされた図面"):
+        """縮小済みのプレビュー画像を表示"""
+        
+        _, preview_image = _load_preview_image(uploaded_file)
+        st.image(preview_image, caption=caption, use_container_width=True)
 
 class ProgressTracker:
     """進捗トラッカークラス"""
@@ -145,29 +279,30 @@ class DataExporter:
     def export_to_excel(df: pd.DataFrame, filename: str):
         """Excelにエクスポート"""
         
-        # Excelファイル作成
-        excel_buffer = pd.ExcelWriter(filename, engine='openpyxl')
-        df.to_excel(excel_buffer, index=False, sheet_name='データ')
-        excel_buffer.close()
+        # Excelファイルをメモリ上に作成（ディスクには書き出さない）
+        excel_buffer = io.BytesIO()
+        with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
+            df.to_excel(writer, index=False, sheet_name='データ')
         
         # ダウンロードボタン
-        with open(filename, "rb") as f:
-            st.download_button(
-                label="Excelファイルをダウンロード",
-                data=f,
-                file_name=filename,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+        st.download_button(
+            label="Excelファイルをダウンロード",
+            data=excel_buffer.getvalue(),
+            file_name=filename,
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
     
     @staticmethod
     def export_to_csv(df: pd.DataFrame, filename: str):
         """CSVにエクスポート"""
         
-        csv = df.to_csv(index=False).encode('utf-8')
+        # 10,000行ずつ書き出し、全体を単一の文字列として保持しない
+        csv_buffer = io.BytesIO()
+        df.to_csv(csv_buffer, index=False, chunksize=10_000, encoding='utf-8')
         
         st.download_button(
             label="CSVファイルをダウンロード",
-            data=csv,
+            data=csv_buffer.getvalue(),
             file_name=filename,
             mime="text/csv"
         )
@@ -176,12 +311,14 @@ class DataExporter:
     def export_to_json(data: Dict[str, Any], filename: str):
         """JSONにエクスポート"""
         
-        import json
-        json_str = json.dumps(data, ensure_ascii=False, indent=2)
+        if ORJSON_SUPPORT:
+            json_data = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            json_data = json.dumps(data, ensure_ascii=False, indent=2)
         
         st.download_button(
             label="JSONファイルをダウンロード",
-            data=json_str,
+            data=json_data,
             file_name=filename,
             mime="application/json"
         )
@@ -193,12 +330,25 @@ class StatisticsChart:
     def show_time_series(df: pd.DataFrame, x_col: str, y_col: str, title: str):
         """時系列チャートを表示"""
         
+        # 点数が多い場合は形状を保ったまま間引く
+        if len(df) > MAX_TIME_SERIES_POINTS:
+            x_values = df[x_col]
+            if pd.api.types.is_datetime64_any_dtype(x_values):
+                x_values = x_values.astype('int64')
+            indices = _lttb_indices(
+                x_values.to_numpy(dtype=np.float64),
+                df[y_col].to_numpy(dtype=np.float64),
+                MAX_TIME_SERIES_POINTS
+            )
+            df = df.iloc[indices]
+        
         fig = px.line(
             df, 
             x=x_col, 
             y=y_col,
             title=title,
-            markers=True
+            markers=True,
+            render_mode='webgl' if len(df) > WEBGL_POINT_THRESHOLD else 'svg'
         )
         
         st.plotly_chart(fig, use_container_width=True)
@@ -207,11 +357,21 @@ class StatisticsChart:
     def show_distribution(data: List[float], title: str):
         """分布チャートを表示"""
         
-        fig = px.histogram(
-            x=data,
-            nbins=20,
-            title=title
-        )
+        # ビン集計はサーバー側で行い、集計済みの棒グラフとして送る
+        # （None・NaN・無限大は集計から除外）
+        values = np.asarray(data, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            st.info(f"{title}: データがありません")
+            return
+        
+        counts, edges = np.histogram(values, bins=20)
+        fig = go.Figure(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges)
+        ))
+        fig.update_layout(title=title, bargap=0, yaxis_title='count')
         
         st.plotly_chart(fig, use_container_width=True)
     
@@ -219,11 +379,8 @@ class StatisticsChart:
     def show_comparison(labels: List[str], values: List[float], title: str):
         """比較チャートを表示"""
         
-        fig = px.bar(
-            x=labels,
-            y=values,
-            title=title
-        )
+        fig = go.Figure(go.Bar(x=labels, y=values))
+        fig.update_layout(title=title)
         
         st.plotly_chart(fig, use_container_width=True)
 
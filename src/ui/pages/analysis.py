@@ -1,19 +1,96 @@
 # src/ui/pages/analysis.py
 
 import streamlit as st
-import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
 import time
+import hashlib
+import asyncio
+import tempfile
 from pathlib import Path
 from datetime import datetime
 import sys
-import plotly.express as px
+from typing import Any, Tuple, TYPE_CHECKING
 
-from src.core.agent import create_agent_from_config
-from src.utils.batch_processor import BatchProcessor
-from src.utils.file_handler import FileHandler
-from src.utils.excel_manager import ExcelManager
-from src.utils.image_processor import A4ImageProcessor
-from src.ui.components import NotificationManager, MetricsDisplay
+from src.utils.config import SystemConfig
+from src.ui.components import NotificationManager, MetricsDisplay, FileUploader, get_agent
+
+# Excel・画像処理クラスは各ファクトリ内でインポートし、型注釈用にのみ参照する
+if TYPE_CHECKING:
+    from src.utils.excel_manager import ExcelManager
+    from src.utils.image_processor import A4ImageProcessor
+
+# 一時ファイルの保存先（利用可能ならメモリ上のtmpfs）
+RAM_TEMP_DIR = Path('/dev/shm')
+
+# 処理状態ごとの表示色
+STATUS_COLORS = {
+    '待機中': 'blue',
+    '処理中': 'orange',
+    '完了': 'green',
+    'エラー': 'red'
+}
+
+@st.cache_resource
+def get_image_processor() -> 'A4ImageProcessor':
+    """画像処理器を取得（再実行間で共有）"""
+    from src.utils.image_processor import A4ImageProcessor
+    return A4ImageProcessor()
+
+@st.cache_resource
+def get_excel_manager() -> 'ExcelManager':
+    """Excel管理クラスを取得（再実行間で共有）"""
+    from src.utils.excel_manager import ExcelManager
+    return ExcelManager()
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def analyze_a4_cached(file_hash: str, _file_path: str):
+    """A4情報を解析（同じ内容のファイルは結果を再利用）"""
+    return get_image_processor().analyze_a4_drawing(_file_path)
+
+async def run_analysis_pipeline(temp_path: str, file_hash: str, config: SystemConfig,
+                                status: Any) -> Tuple[Any, bytes]:
+    """解析パイプラインを実行（ブロッキング処理はワーカースレッドで実行）"""
+    
+    # 画像処理（A4情報の解析）とエージェント準備は互いに独立しているため並行実行
+    status.update(label="画像処理・AIエージェント準備中...")
+    drawing_info, agent = await asyncio.gather(
+        asyncio.to_thread(analyze_a4_cached, file_hash, temp_path),
+        asyncio.to_thread(get_agent, config)
+    )
+    
+    # 必要に応じて画像を最適化
+    analysis_path = temp_path
+    if not drawing_info.is_valid_a4:
+        status.update(label="画像最適化中...")
+        analysis_path = await asyncio.to_thread(get_image_processor().optimize_a4_drawing, temp_path)
+    
+    try:
+        # 解析実行
+        status.update(label="図面解析中...")
+        analysis_result = await asyncio.to_thread(agent.analyze_drawing, analysis_path)
+    finally:
+        # 最適化画像の削除
+        if analysis_path != temp_path:
+            Path(analysis_path).unlink(missing_ok=True)
+    
+    # Excel出力（ディスクを介さずメモリ上で作成）
+    status.update(label="結果保存中...")
+    excel_bytes = await asyncio.to_thread(
+        get_excel_manager().create_analysis_report_bytes, analysis_result
+    )
+    
+    return analysis_result, excel_bytes
+
+@st.cache_data(max_entries=16)
+def _build_confidence_fig(fields: Tuple[str, ...], confidences: Tuple[float, ...]) -> go.Figure:
+    """解析信頼度の棒グラフを作成（入力が同じ場合は再利用）"""
+    fig = go.Figure(go.Bar(
+        x=list(fields),
+        y=np.fromiter(confidences, dtype=np.float32, count=len(confidences))
+    ))
+    fig.update_layout(title='解析信頼度', xaxis_title='category', yaxis_title='confidence')
+    return fig
 
 def show():
     st.title("図面解析")
@@ -26,15 +103,8 @@ def show():
         st.session_state.analysis_results = None
     
     # ステータス表示
-    status_color = {
-        '待機中': 'blue',
-        '処理中': 'orange',
-        '完了': 'green',
-        'エラー': 'red'
-    }
-    
     st.markdown(
-        f"<h3 style='color: {status_color.get(st.session_state.processing_status, 'gray')};'>状態: {st.session_state.processing_status}</h3>",
+        f"<h3 style='color: {STATUS_COLORS.get(st.session_state.processing_status, 'gray')};'>状態: {st.session_state.processing_status}</h3>",
         unsafe_allow_html=True
     )
     
@@ -42,8 +112,9 @@ def show():
     uploaded_file = st.file_uploader("図面ファイルをアップロード", type=['png', 'jpg', 'jpeg', 'pdf'])
     
     if uploaded_file is not None:
-        # ファイルプレビュー
-        st.image(uploaded_file, caption="アップロードされた図面", use_container_width=True)
+        # ファイルプレビュー（縮小画像を表示）
+        if uploaded_file.type.startswith('image'):
+            FileUploader.show_image_preview(uploaded_file)
         
         # 解析ボタン
         if st.button("解析開始", key="start_analysis"):
@@ -51,60 +122,34 @@ def show():
                 # 処理中状態に更新
                 st.session_state.processing_status = '処理中'
                 
-                # 一時ファイルに保存
-                temp_path = f"temp_{datetime.now().strftime('%Y%m%d%H%M%S')}.{uploaded_file.name.split('.')[-1]}"
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
+                # アップロード内容のビュー（コピーなし）をハッシュ計算と一時保存で共用
+                file_buffer = uploaded_file.getbuffer()
+                
+                # ファイル内容のハッシュ（キャッシュキー）
+                file_hash = hashlib.blake2b(file_buffer, digest_size=16).hexdigest()
                 
-                # プログレスバー
-                progress_bar = st.progress(0)
-                status_text = st.empty()
+                # 一時ファイルに保存
+                temp_dir = RAM_TEMP_DIR if RAM_TEMP_DIR.is_dir() else None
+                with tempfile.NamedTemporaryFile(delete=False, suffix=Path(uploaded_file.name).suffix,
+                                                 dir=temp_dir) as f:
+                    f.write(file_buffer)
+                    temp_path = f.name
+                file_buffer.release()
                 
                 # 解析処理
                 try:
-                    # 画像処理
-                    status_text.text("画像処理中...")
-                    progress_bar.progress(20)
-                    
-                    # 画像処理（A4情報の解析）
-                    image_processor = A4ImageProcessor()
-                    drawing_info = image_processor.analyze_a4_drawing(temp_path)
-                    
-                    # 必要に応じて画像を最適化
-                    if not drawing_info.is_valid_a4:
-                        status_text.text("画像最適化中...")
-                        temp_path = image_processor.optimize_a4_drawing(temp_path)
-                    
-                    # エージェント作成
-                    status_text.text("AIエージェント準備中...")
-                    progress_bar.progress(40)
-                    
-                    # システム設定を取得
-                    from src.utils.config import SystemConfig
                     config = SystemConfig()
-                    agent = create_agent_from_config(config)
-                    
-                    # 解析実行
-                    status_text.text("図面解析中...")
-                    progress_bar.progress(60)
                     
-                    analysis_result = agent.analyze_drawing(temp_path)
-                    
-                    # 結果保存
-                    status_text.text("結果保存中...")
-                    progress_bar.progress(80)
-                    
-                    # 結果をセッションに保存
-                    st.session_state.analysis_results = analysis_result
-                    
-                    # Excel出力
-                    excel_manager = ExcelManager()
-                    excel_path = f"analysis_result_{datetime.now().strftime('%Y%m%d%H%M%S')}.xlsx"
-                    excel_path = excel_manager.create_analysis_report(analysis_result, excel_path)
-                    
-                    # 完了表示
-                    status_text.text("完了")
-                    progress_bar.progress(100)
+                    with st.status("解析中...", expanded=True) as status:
+                        analysis_result, excel_bytes = asyncio.run(
+                            run_analysis_pipeline(temp_path, file_hash, config, status)
+                        )
+                        
+                        # 結果をセッションに保存
+                        st.session_state.analysis_results = analysis_result
+                        
+                        # 完了表示
+                        status.update(label="完了", state="complete")
                     
                     # 結果表示
                     st.subheader("解析結果")
@@ -114,25 +159,20 @@ def show():
                     
                     # グラフ表示
                     if analysis_result.extracted_data:
-                        # 抽出データからデータフレーム作成
-                        data = []
-                        for field_name, extraction_result in analysis_result.extracted_data.items():
-                            data.append({
-                                'category': field_name,
-                                'confidence': extraction_result.confidence
-                            })
-                        df = pd.DataFrame(data)
-                        fig = px.bar(df, x='category', y='confidence', title='解析信頼度')
-                        st.plotly_chart(fig, use_container_width=True)
+                        extracted = analysis_result.extracted_data
+                        fig = _build_confidence_fig(
+                            tuple(extracted.keys()),
+                            tuple(result.confidence for result in extracted.values())
+                        )
+                        st.plotly_chart(fig, use_container_width=True, key="confidence_chart")
                     
                     # ダウンロードボタン
-                    with open(excel_path, "rb") as file:
-                        st.download_button(
-                            label="解析結果をダウンロード",
-                            data=file,
-                            file_name=excel_path,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                        )
+                    st.download_button(
+                        label="解析結果をダウンロード",
+                        data=excel_bytes,
+                        file_name=f"analysis_result_{datetime.now().strftime('%Y%m%d%H%M%S')}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    )
                     
                     # 処理完了
                     st.session_state.processing_status = '完了'
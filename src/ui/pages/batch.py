@@ -3,23 +3,45 @@
 import streamlit as st
 import pandas as pd
 import time
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
 from datetime import datetime
-import sys
+from typing import Dict, Optional, Tuple
 
-# プロジェクトルートをパスに追加
-project_root = Path(__file__).parent.parent.parent.parent
-sys.path.append(str(project_root))
-
-from src.core.agent import create_agent_from_config
-from src.utils.batch_processor import BatchProcessor
-from src.utils.file_handler import FileHandler
-from src.utils.excel_manager import ExcelManager
+from src.utils.config import SystemConfig
 from src.ui.components import (
     FileUploader, ProgressTracker, NotificationManager, 
-    MetricsDisplay, DataExporter, StatisticsChart
+    MetricsDisplay, DataExporter, StatisticsChart,
+    get_agent, agent_config_key
 )
 
+# デフォルト製品タイプの選択肢
+PRODUCT_TYPE_OPTIONS = ("機械部品", "電気部品", "組立図", "配線図", "その他")
+
+# バッチ処理の対応ファイル形式
+SUPPORTED_FORMATS = ('.jpg', '.jpeg', '.png', '.pdf', '.tiff')
+
+# 入力ディレクトリ走査用のワーカー（大きなディレクトリでも画面描画を止めない）
+SCAN_WAIT_SECONDS = 2.0
+_scan_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="batch-scan")
+_scan_futures: Dict[str, Future] = {}
+_scan_lock = threading.Lock()
+
+# 進捗情報をセッション状態へ反映する最小間隔（秒）
+PROGRESS_FLUSH_INTERVAL = 0.25
+
+@st.cache_data(ttl=30, show_spinner=False, hash_funcs={SystemConfig: agent_config_key})
+def load_recent_batch_history(config: SystemConfig, limit: int = 5) -> list:
+    """最近のバッチ履歴を取得（30秒間は結果を再利用）"""
+    return get_agent(config).get_batch_history(limit=limit)
+
+@st.cache_data(ttl=30, show_spinner=False, hash_funcs={SystemConfig: agent_config_key})
+def load_batch_statistics(config: SystemConfig) -> dict:
+    """バッチ処理統計を取得（30秒間は結果を再利用）"""
+    return get_agent(config).get_batch_statistics()
+
 def show():
     """バッチ処理ページを表示"""
     
@@ -127,7 +149,7 @@ def show_batch_execution_tab():
             if not auto_product_type:
                 default_product_type = st.selectbox(
                     "デフォルト製品タイプ:",
-                    ["機械部品", "電気部品", "組立図", "配線図", "その他"],
+                    PRODUCT_TYPE_OPTIONS,
                     help="自動判定しない場合のデフォルト"
                 )
             else:
@@ -180,62 +202,124 @@ def show_batch_execution_tab():
         # 最近のバッチ履歴
         show_recent_batch_history()
 
+@st.cache_data(ttl=5, show_spinner=False)
+def _dir_state(path: str) -> Tuple[bool, int]:
+    """ディレクトリの存在とエントリ数を取得（5秒間は結果を再利用）"""
+    
+    try:
+        with os.scandir(path) as it:
+            return True, sum(1 for entry in it if not entry.name.startswith('.'))
+    except OSError:
+        # 存在しない・ディレクトリでない・読み取り権限がない場合
+        return False, 0
+
 def check_directories(input_dir, output_dir):
     """ディレクトリの存在確認"""
     
     col1, col2 = st.columns(2)
     
     with col1:
-        input_path = Path(input_dir)
-        if input_path.exists():
-            file_count = len(list(input_path.glob('*')))
+        input_exists, file_count = _dir_state(input_dir)
+        if input_exists:
             st.success(f"✅ 入力ディレクトリ存在 ({file_count}ファイル)")
         else:
             st.error("❌ 入力ディレクトリが存在しません")
     
     with col2:
-        output_path = Path(output_dir)
-        if output_path.exists():
+        output_exists, _ = _dir_state(output_dir)
+        if output_exists:
             st.success("✅ 出力ディレクトリ存在")
         else:
             st.warning("⚠️ 出力ディレクトリを作成します")
 
+def _list_supported_files(input_directory: str) -> pd.DataFrame:
+    """入力ディレクトリを走査して対応ファイル一覧を作成"""
+    
+    # 対応ファイルを検索（ディレクトリは1回だけ走査し、DirEntryのキャッシュ済み情報を利用）
+    # シンボリックリンクの図面もバッチ処理の対象になるため一覧に含める
+    with os.scandir(input_directory) as it:
+        entries = [
+            entry for entry in it
+            if entry.is_file() and entry.name.lower().endswith(SUPPORTED_FORMATS)
+        ]
+    
+    if not entries:
+        return pd.DataFrame(columns=['ファイル名', 'サイズ', '更新日', '形式'])
+    
+    names, sizes, mtimes = [], [], []
+    for entry in entries:
+        # シンボリックリンクのみリンク先を参照（サイズ・更新日はリンク先の値を表示）
+        stat = entry.stat(follow_symlinks=entry.is_symlink())
+        names.append(entry.name)
+        sizes.append(stat.st_size)
+        mtimes.append(stat.st_mtime)
+    
+    # 表示用の整形は列単位で一括変換
+    df = pd.DataFrame({'ファイル名': names, '_size': sizes, '_mtime': mtimes})
+    df['サイズ'] = (df['_size'] / 1024).map('{:.1f} KB'.format)
+    # 更新日はファイルごとにローカル時刻へ変換（夏時間の切り替えをまたいでもずれない）
+    df['更新日'] = [datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M') for mtime in mtimes]
+    df['形式'] = df['ファイル名'].str.extract(r'(\.[^.]+)$', expand=False).str.upper()
+    df.sort_values('ファイル名', inplace=True, kind='stable', ignore_index=True)
+    return df.drop(columns=['_size', '_mtime'])
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _scan_input_dir(input_directory: str) -> pd.DataFrame:
+    """入力ディレクトリの対応ファイル一覧を取得（10秒間は結果を再利用）
+    
+    走査はワーカースレッドで行い、待機時間内に終わらない場合は
+    TimeoutErrorを送出する（走査は継続し、次回の再実行で結果を取得）。
+    """
+    with _scan_lock:
+        future = _scan_futures.get(input_directory)
+        if future is None:
+            future = _scan_executor.submit(_list_supported_files, input_directory)
+            _scan_futures[input_directory] = future
+    
+    try:
+        return future.result(timeout=SCAN_WAIT_SECONDS)
+    finally:
+        # 完了した走査（失敗を含む）は破棄し、次回は改めて走査する
+        _discard_scan(input_directory, future)
+
+def _discard_scan(input_directory: str, future: Optional[Future] = None):
+    """完了済みの走査を破棄（実行中の走査は破棄せず結果を待つ）
+    
+    futureを指定した場合は、登録されているものが同一の場合だけ破棄する。
+    """
+    with _scan_lock:
+        current = _scan_futures.get(input_directory)
+        if current is not None and current.done() and (future is None or current is future):
+            del _scan_futures[input_directory]
+
 def show_file_list(input_directory):
     """処理対象ファイル一覧を表示"""
     
     with st.expander("📋 処理対象ファイル一覧", expanded=False):
         try:
-            input_path = Path(input_directory)
-            if not input_path.exists():
+            # 存在確認のみ（ディレクトリ全体の走査はワーカースレッドで行う）
+            if not os.path.isdir(input_directory):
                 st.warning("ディレクトリが存在しません")
                 return
             
-            # 対応ファイルを検索
-            supported_formats = ['.jpg', '.jpeg', '.png', '.pdf', '.tiff']
-            files = []
+            if st.button("🔄 再スキャン", key="rescan_input_dir"):
+                _dir_state.clear()
+                _scan_input_dir.clear()
+                _discard_scan(input_directory)
             
-            for ext in supported_formats:
-                files.extend(list(input_path.glob(f"*{ext}")))
-                files.extend(list(input_path.glob(f"*{ext.upper()}")))
+            try:
+                df = _scan_input_dir(input_directory)
+            except FutureTimeoutError:
+                st.info("スキャン中… しばらくしてから再スキャンしてください")
+                return
             
-            if files:
+            if not df.empty:
                 # ファイル情報テーブル
-                file_data = []
-                for file_path in sorted(files):
-                    stat = file_path.stat()
-                    file_data.append({
-                        'ファイル名': file_path.name,
-                        'サイズ': f"{stat.st_size / 1024:.1f} KB",
-                        '更新日': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M'),
-                        '形式': file_path.suffix.upper()
-                    })
-                
-                df = pd.DataFrame(file_data)
                 st.dataframe(df, use_container_width=True, hide_index=True)
                 
-                st.info(f"📁 処理対象: {len(files)}ファイル")
+                st.info(f"📁 処理対象: {len(df)}ファイル")
             else:
-                st.warning(f"対応ファイルが見つかりません\n対応形式: {', '.join(supported_formats)}")
+                st.warning(f"対応ファイルが見つかりません\n対応形式: {', '.join(SUPPORTED_FORMATS)}")
         
         except Exception as e:
             st.error(f"ファイル一覧取得エラー: {e}")
@@ -252,10 +336,14 @@ def show_batch_progress():
     total_files = progress_info.get('total_files', 0)
     processed_files = progress_info.get('processed_files', 0)
     
-    if total_files > 0:
-        progress = processed_files / total_files
-        st.progress(progress)
-        st.text(f"進捗: {processed_files}/{total_files} ({progress*100:.0f}%)")
+    # 総ファイル数の報告前は詳細メトリクスを描画しない
+    if total_files == 0:
+        st.progress(0.0)
+        return
+    
+    progress = processed_files / total_files
+    st.progress(progress)
+    st.text(f"進捗: {processed_files}/{total_files} ({progress*100:.0f}%)")
     
     # 詳細情報
     if progress_info:
@@ -305,11 +393,29 @@ def show_batch_summary():
         errors = last_batch.get('errors', [])
         if errors:
             with st.expander(f"⚠️ エラー詳細 ({len(errors)}件)", expanded=False):
-                for error in errors[:10]:  # 最大10件表示
-                    st.text(f"❌ {error.get('file', '不明')}: {error.get('error', 'エラー詳細なし')}")
+                recent_errors = errors[:10]  # 最大10件表示
+                error_df = pd.DataFrame({
+                    'ファイル': [error.get('file', '不明') for error in recent_errors],
+                    'エラー': [error.get('error', 'エラー詳細なし') for error in recent_errors]
+                })
+                st.dataframe(error_df, use_container_width=True, hide_index=True)
     else:
         st.info("まだバッチ処理が実行されていません")
 
+@st.cache_data(max_entries=8, show_spinner=False)
+def _build_history_df(batch_keys: Tuple[Tuple[str, str], ...], _history: list) -> pd.DataFrame:
+    """バッチ履歴の表示用データフレームを作成（同じ履歴の並びなら再利用）"""
+    
+    # 列単位で一括変換
+    records = pd.DataFrame.from_records(_history)
+    return pd.DataFrame({
+        "実行日時": pd.to_datetime(records['created_at']).dt.strftime("%Y-%m-%d %H:%M"),
+        "ファイル数": records['total_files'],
+        "成功": records['successful_files'],
+        "エラー": records['error_files'],
+        "処理時間": records['total_time'].map('{:.0f}秒'.format)
+    })
+
 def show_recent_batch_history():
     """最近のバッチ履歴を表示"""
     
@@ -317,27 +423,34 @@ def show_recent_batch_history():
         try:
             config = st.session_state.config
             if config:
-                agent = create_agent_from_config(config)
-                history = agent.get_batch_history(limit=5)
+                history = load_recent_batch_history(config, 5)
                 
                 if history:
-                    history_data = []
-                    for item in history:
-                        history_data.append({
-                            "実行日時": datetime.fromisoformat(item['created_at']).strftime("%Y-%m-%d %H:%M"),
-                            "ファイル数": item['total_files'],
-                            "成功": item['successful_files'],
-                            "エラー": item['error_files'],
-                            "処理時間": f"{item['total_time']:.0f}秒"
-                        })
-                    
-                    df = pd.DataFrame(history_data)
+                    df = _build_history_df(
+                        tuple((item['batch_id'], item['created_at']) for item in history), history
+                    )
                     st.dataframe(df, use_container_width=True, hide_index=True)
                 else:
                     st.info("バッチ処理履歴がありません")
         except Exception as e:
             st.error(f"履歴取得エラー: {e}")
 
+@st.cache_data(max_entries=4, show_spinner=False)
+def _build_results_df(fingerprint: tuple, _file_results: list) -> pd.DataFrame:
+    """ファイル別処理結果の表示用データフレームを作成（同じバッチ結果なら再利用）"""
+    
+    # 列単位で一括変換
+    records = pd.DataFrame.from_records(_file_results).reindex(
+        columns=['file_path', 'success', 'confidence_score', 'processing_time', 'error']
+    )
+    return pd.DataFrame({
+        'ファイル名': records['file_path'].astype(str).str.rsplit(os.sep, n=1).str[-1],
+        '状態': records['success'].map({True: '成功'}).fillna('エラー'),
+        '信頼度': records['confidence_score'].fillna(0).map('{:.1%}'.format),
+        '処理時間': records['processing_time'].fillna(0).map('{:.1f}秒'.format),
+        'エラー詳細': records['error'].fillna('-')
+    })
+
 def show_batch_results_tab():
     """バッチ処理結果タブ"""
     
@@ -366,18 +479,12 @@ def show_batch_results_tab():
         st.markdown("### 📋 処理結果詳細")
         
         if results.get('file_results'):
-            # データフレーム作成
-            result_data = []
-            for file_result in results['file_results']:
-                result_data.append({
-                    'ファイル名': Path(file_result['file_path']).name,
-                    '状態': '成功' if file_result['success'] else 'エラー',
-                    '信頼度': f"{file_result.get('confidence_score', 0):.1%}",
-                    '処理時間': f"{file_result.get('processing_time', 0):.1f}秒",
-                    'エラー詳細': file_result.get('error', '-')
-                })
-            
-            df = pd.DataFrame(result_data)
+            # データフレーム作成（同じバッチ結果なら再利用）
+            fingerprint = (
+                results.get('batch_id'), results['total_files'],
+                results['successful_files'], results['total_time']
+            )
+            df = _build_results_df(fingerprint, results['file_results'])
             st.dataframe(df, use_container_width=True)
             
             # エクスポートオプション
@@ -409,8 +516,7 @@ def show_batch_statistics_tab():
     try:
         config = st.session_state.config
         if config:
-            agent = create_agent_from_config(config)
-            stats = agent.get_batch_statistics()
+            stats = load_batch_statistics(config)
             
             if stats:
                 # 基本統計
@@ -499,16 +605,27 @@ def execute_batch_processing(input_directory: str, output_directory: str, option
             'errors': 0,
             'start_time': time.time()
         }
+        update_progress, flush_progress = create_progress_updater(st.session_state.batch_progress)
         
         # バッチプロセッサ初期化
+        from src.utils.batch_processor import BatchProcessor
+        
         processor = BatchProcessor(
-            agent=create_agent_from_config(config),
+            agent=get_agent(config),
             batch_size=options['batch_size'],
             max_workers=options['max_workers'],
             timeout_minutes=options['timeout_minutes'],
             retry_attempts=options['retry_attempts']
         )
         
+        # 進捗表示用のプレースホルダー（ページ全体を再実行せずにその場で更新）
+        progress_slot = st.empty()
+        status_slot = st.empty()
+        
+        def on_progress(progress_info: dict):
+            if update_progress(progress_info):
+                render_progress(progress_slot, status_slot, st.session_state.batch_progress)
+        
         # 処理実行
         results = processor.process_directory(
             input_directory=input_directory,
@@ -517,7 +634,20 @@ def execute_batch_processing(input_directory: str, output_directory: str, option
             default_product_type=options['default_product_type'],
             error_handling=options['error_handling'],
             output_formats=options['output_formats'],
-            progress_callback=update_progress
+            progress_callback=on_progress
+        )
+        flush_progress()
+        progress_slot.empty()
+        status_slot.empty()
+        
+        # エラー一覧を抽出（ブールインデックスで一括抽出）
+        file_results = pd.DataFrame.from_records(results.get('file_results', [])).reindex(
+            columns=['file_path', 'success', 'error']
+        )
+        errors = (
+            file_results.loc[~file_results['success'].astype(bool), ['file_path', 'error']]
+            .rename(columns={'file_path': 'file'})
+            .to_dict(orient='records')
         )
         
         # 結果保存
@@ -526,14 +656,12 @@ def execute_batch_processing(input_directory: str, output_directory: str, option
             'total_files': results['total_files'],
             'success_rate': results['successful_files'] / results['total_files'] if results['total_files'] > 0 else 0,
             'total_time': results['total_time'],
-            'errors': [
-                {'file': r['file_path'], 'error': r['error']}
-                for r in results.get('file_results', [])
-                if not r['success']
-            ]
+            'errors': errors
         }
         
-        # 処理完了
+        # 処理完了（今回のバッチを履歴・統計に反映）
+        load_recent_batch_history.clear()
+        load_batch_statistics.clear()
         st.session_state.batch_processing = False
         NotificationManager.show_success("バッチ処理が完了しました")
         
@@ -545,7 +673,46 @@ def execute_batch_processing(input_directory: str, output_directory: str, option
         st.session_state.batch_processing = False
         NotificationManager.show_error(f"バッチ処理エラー: {e}")
 
-def update_progress(progress_info: dict):
-    """進捗情報を更新"""
+def create_progress_updater(progress: dict, flush_interval: float = PROGRESS_FLUSH_INTERVAL):
+    """バッチ実行ごとの進捗更新関数を作成（progressへの反映はflush_interval秒ごとに間引く）
+    
+    Returns:
+        (update_progress, flush_progress): update_progressは反映した場合Trueを返す
+    """
+    
+    pending: dict = {}
+    last_emit = [0.0]
+    
+    def flush_progress():
+        """保留中の進捗情報を反映"""
+        if pending:
+            progress.update(pending)
+            pending.clear()
+        last_emit[0] = time.time()
+    
+    def update_progress(progress_info: dict) -> bool:
+        """進捗情報を更新"""
+        pending.update(progress_info)
+        
+        total_files = pending.get('total_files', 0)
+        finished = total_files > 0 and pending.get('processed_files', 0) >= total_files
+        if finished or time.time() - last_emit[0] >= flush_interval:
+            flush_progress()
+            return True
+        return False
+    
+    return update_progress, flush_progress
+
+def render_progress(progress_slot, status_slot, progress_info: dict):
+    """プレースホルダーに進捗を描画"""
     
-    st.session_state.batch_progress.update(progress_info)
+    total_files = progress_info.get('total_files', 0)
+    if total_files == 0:
+        return
+    
+    processed_files = progress_info.get('processed_files', 0)
+    progress = min(processed_files / total_files, 1.0)
+    progress_slot.progress(progress, text=f"進捗: {processed_files}/{total_files} ({progress*100:.0f}%)")
+    status_slot.text(
+        f"成功: {progress_info.get('successful', 0)} / エラー: {progress_info.get('errors', 0)}"
+    )
@@ -1,17 +1,12 @@
 # src/ui/pages/init.py
 
 import streamlit as st
-import pandas as pd
+import os
 from pathlib import Path
 from datetime import datetime
-import sys
-
-# プロジェクトルートをパスに追加
-project_root = Path(__file__).parent.parent.parent.parent
-sys.path.append(str(project_root))
 
 from src.utils.config import SystemConfig
-from src.ui.components import NotificationManager, MetricsDisplay
+from src.ui.components import NotificationManager, MetricsDisplay, existing_children, path_exists
 
 def show():
     """初期設定ページを表示"""
@@ -20,10 +15,7 @@ def show():
     st.markdown("A4図面解析システムの初期設定を行います。")
     
     # 初期化状態確認
-    if 'initialized' not in st.session_state:
-        st.session_state.initialized = False
-    
-    if st.session_state.initialized:
+    if st.session_state.setdefault('initialized', False):
         show_initialized_state()
     else:
         show_initialization_form()
@@ -69,13 +61,13 @@ def show_initialized_state():
     
     for i, (name, path) in enumerate(directories.items()):
         with col1 if i % 2 == 0 else col2:
-            path_obj = Path(path)
-            if path_obj.exists():
+            if path_exists(path):
                 st.success(f"✅ {name}: 存在")
             else:
                 st.error(f"❌ {name}: 存在しません")
                 if st.button(f"{name}を作成", key=f"create_{i}"):
-                    path_obj.mkdir(parents=True, exist_ok=True)
+                    Path(path).mkdir(parents=True, exist_ok=True)
+                    existing_children.clear()
                     st.success(f"{name}を作成しました")
                     st.rerun()
     
@@ -215,12 +207,11 @@ def initialize_system(api_key, model, input_directory, output_directory, excel_d
         # セッションに設定を保存
         st.session_state.config = config
         
-        # ディレクトリ作成
-        for directory in [input_directory, output_directory, excel_directory, 'data/temp', 'data/excel_templates']:
-            Path(directory).mkdir(parents=True, exist_ok=True)
-        
-        # データベースディレクトリ作成
-        Path(database_path).parent.mkdir(parents=True, exist_ok=True)
+        # ディレクトリ作成（データベースディレクトリを含む）
+        create_directories([
+            input_directory, output_directory, excel_directory,
+            'data/temp', 'data/excel_templates', str(Path(database_path).parent)
+        ])
         
         # 初期化完了フラグ
         st.session_state.initialized = True
@@ -231,3 +222,16 @@ def initialize_system(api_key, model, input_directory, output_directory, excel_d
     except Exception as e:
         st.error(f"初期化エラー: {e}")
         raise
+
+def create_directories(directories):
+    """ディレクトリをまとめて作成（作成済みディレクトリの親は再作成しない）"""
+    
+    created = []
+    # 深い階層から作成し、作成済みパスの祖先は親ごと作成済みのためスキップ
+    for directory in sorted({os.path.normpath(d) for d in directories}, key=len, reverse=True):
+        if any(c.startswith(directory + os.sep) for c in created):
+            continue
+        os.makedirs(directory, exist_ok=True)
+        created.append(directory)
+    
+    existing_children.clear()
@@ -1,19 +1,99 @@
 # src/ui/pages/settings.py
 
 import streamlit as st
-import pandas as pd
-import time
+import os
+import copy
 from pathlib import Path
 from datetime import datetime
-import sys
+from typing import Tuple, TYPE_CHECKING
 
-# プロジェクトルートをパスに追加
-project_root = Path(__file__).parent.parent.parent.parent
-sys.path.append(str(project_root))
+from src.utils.config import SystemConfig, YamlDumper, YamlLoader
+from src.ui.components import NotificationManager, MetricsDisplay, existing_children, path_exists, get_db_manager
 
-from src.utils.config import SystemConfig
-from src.utils.database import DatabaseManager
-from src.ui.components import NotificationManager, MetricsDisplay
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 選択肢と、設定値から選択位置への対応表
+MODEL_OPTIONS = ("gpt-4-vision-preview", "gpt-4", "gpt-4-turbo")
+MODEL_INDEX = {name: i for i, name in enumerate(MODEL_OPTIONS)}
+
+LOG_LEVEL_OPTIONS = ("DEBUG", "INFO", "WARNING", "ERROR")
+LOG_LEVEL_INDEX = {name: i for i, name in enumerate(LOG_LEVEL_OPTIONS)}
+
+SIDEBAR_STATE_OPTIONS = ("expanded", "collapsed")
+SIDEBAR_STATE_INDEX = {name: i for i, name in enumerate(SIDEBAR_STATE_OPTIONS)}
+
+THEME_OPTIONS = ("light", "dark")
+THEME_INDEX = {name: i for i, name in enumerate(THEME_OPTIONS)}
+
+# API設定タブで使用する設定値と既定値
+API_SETTING_DEFAULTS = {
+    'openai.api_key': '',
+    'openai.model': 'gpt-4-vision-preview',
+    'openai.temperature': 0.1,
+    'openai.max_tokens': 2000
+}
+
+# システム設定タブで使用する設定値と既定値
+SYSTEM_SETTING_DEFAULTS = {
+    'processing.batch_size': 10,
+    'processing.max_workers': 4,
+    'processing.timeout_seconds': 300,
+    'processing.retry_attempts': 3,
+    'image_processing.target_dpi': 300,
+    'image_processing.auto_enhance': True,
+    'image_processing.noise_reduction': True,
+    'image_processing.contrast_adjustment': True
+}
+
+# 詳細設定タブで使用する設定値と既定値
+ADVANCED_SETTING_DEFAULTS = {
+    'logging.level': 'INFO',
+    'logging.max_size_mb': 100,
+    'logging.backup_count': 5,
+    'extraction.confidence_threshold': 0.7,
+    'extraction.auto_correction': True,
+    'learning.similarity_threshold': 0.85,
+    'learning.auto_learning': True,
+    'ui.show_tips': True,
+    'ui.sidebar_state': 'expanded',
+    'ui.theme': 'light'
+}
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_database_info(db_path: str, db_mtime: float) -> dict:
+    """データベース情報を取得（DBファイルが更新されるまでは最大30秒間再利用）"""
+    return get_db_manager(db_path).get_database_info()
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_table_counts_df(table_counts: Tuple[Tuple[str, int], ...], total_records: int) -> 'pd.DataFrame':
+    """テーブル別レコード数の表示用データフレームを作成（件数が同じ間は再利用）"""
+    import pandas as pd
+    
+    table_data = []
+    for table, count in table_counts:
+        table_data.append({
+            'テーブル名': table,
+            'レコード数': f"{count:,}",
+            '割合': f"{count/total_records*100:.1f}%" if total_records > 0 else "0%"
+        })
+    
+    return pd.DataFrame(table_data)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_backup_files_df(backup_files: Tuple[Tuple[str, int, float], ...]) -> 'pd.DataFrame':
+    """バックアップ一覧の表示用データフレームを作成（ファイル構成が同じ間は再利用）"""
+    import pandas as pd
+    
+    backup_data = []
+    for name, size, mtime in backup_files:
+        backup_data.append({
+            'ファイル名': name,
+            'サイズ': f"{size / 1024 / 1024:.2f} MB",
+            '作成日時': datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')
+        })
+    
+    return pd.DataFrame(backup_data)
 
 def show():
     """設定ページを表示"""
@@ -46,13 +126,16 @@ def show_api_settings_tab():
         st.error("設定ファイルが読み込まれていません")
         return
     
+    # 使用する設定値をまとめて取得
+    snap = config.snapshot(API_SETTING_DEFAULTS)
+    
     col1, col2 = st.columns([2, 1])
     
     with col1:
         # APIキー設定
         st.markdown("### 🗝️ APIキー")
         
-        current_api_key = config.get('openai.api_key', '')
+        current_api_key = snap['openai.api_key']
         masked_key = current_api_key[:8] + '*' * (len(current_api_key) - 12) + current_api_key[-4:] if len(current_api_key) > 12 else current_api_key
         
         # APIキー表示
@@ -80,17 +163,10 @@ def show_api_settings_tab():
         # モデル設定
         st.markdown("### 🤖 モデル設定")
         
-        model_options = [
-            "gpt-4-vision-preview",
-            "gpt-4",
-            "gpt-4-turbo"
-        ]
-        
-        current_model = config.get('openai.model', 'gpt-4-vision-preview')
         selected_model = st.selectbox(
             "使用モデル:",
-            model_options,
-            index=model_options.index(current_model) if current_model in model_options else 0,
+            MODEL_OPTIONS,
+            index=MODEL_INDEX.get(snap['openai.model'], 0),
             help="解析に使用するAIモデルを選択"
         )
         
@@ -102,7 +178,7 @@ def show_api_settings_tab():
                 "Temperature:",
                 min_value=0.0,
                 max_value=1.0,
-                value=config.get('openai.temperature', 0.1),
+                value=snap['openai.temperature'],
                 step=0.1,
                 help="低いほど一貫した結果（推奨: 0.1）"
             )
@@ -112,7 +188,7 @@ def show_api_settings_tab():
                 "最大トークン数:",
                 min_value=500,
                 max_value=4000,
-                value=config.get('openai.max_tokens', 2000),
+                value=snap['openai.max_tokens'],
                 help="APIリクエストの最大トークン数"
             )
         
@@ -223,6 +299,9 @@ def show_system_settings_tab():
         st.error("設定ファイルが読み込まれていません")
         return
     
+    # 使用する設定値をまとめて取得
+    snap = config.snapshot(SYSTEM_SETTING_DEFAULTS)
+    
     # ファイル・ディレクトリ設定
     st.markdown("### 📁 ディレクトリ設定")
     
@@ -235,100 +314,91 @@ def show_system_settings_tab():
     }
     
     directory_values = {}
+    directory_snap = config.snapshot(dict(directories.values()))
     
-    for label, (config_key, default_value) in directories.items():
-        current_value = config.get(config_key, default_value)
-        new_value = st.text_input(f"{label}:", value=current_value, key=f"dir_{config_key}")
-        directory_values[config_key] = new_value
+    # 入力中は再実行しないようフォームにまとめ、保存時のみ反映
+    with st.form("system_settings_form"):
+        for label, (config_key, _) in directories.items():
+            directory_values[config_key] = st.text_input(
+                f"{label}:", value=directory_snap[config_key], key=f"dir_{config_key}"
+            )
         
-        # ディレクトリ存在確認
-        dir_path = Path(new_value)
-        if dir_path.exists():
-            st.success(f"✅ {label}: 存在")
-        else:
-            st.warning(f"⚠️ {label}: 存在しません")
-            if st.button(f"📁 {label}作成", key=f"create_{config_key}"):
-                try:
-                    dir_path.mkdir(parents=True, exist_ok=True)
-                    NotificationManager.show_success(f"{label}を作成しました")
-                    st.rerun()
-                except Exception as e:
-                    NotificationManager.show_error(f"ディレクトリ作成エラー: {e}")
-    
-    # 処理設定
-    st.markdown("### ⚡ 処理設定")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        batch_size = st.number_input(
-            "バッチサイズ:",
-            min_value=1,
-            max_value=50,
-            value=config.get('processing.batch_size', 10),
-            help="同時に処理するファイル数"
-        )
+        # 処理設定
+        st.markdown("### ⚡ 処理設定")
         
-        max_workers = st.number_input(
-            "最大ワーカー数:",
-            min_value=1,
-            max_value=16,
-            value=config.get('processing.max_workers', 4),
-            help="並列処理のワーカー数"
-        )
-    
-    with col2:
-        timeout_seconds = st.number_input(
-            "タイムアウト（秒）:",
-            min_value=30,
-            max_value=1800,
-            value=config.get('processing.timeout_seconds', 300),
-            help="1ファイルあたりのタイムアウト時間"
-        )
+        col1, col2 = st.columns(2)
         
-        retry_attempts = st.number_input(
-            "リトライ回数:",
-            min_value=0,
-            max_value=10,
-            value=config.get('processing.retry_attempts', 3),
-            help="失敗時のリトライ回数"
-        )
-    
-    # 画像処理設定
-    st.markdown("### 🖼️ 画像処理設定")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        target_dpi = st.number_input(
-            "目標DPI:",
-            min_value=150,
-            max_value=600,
-            value=config.get('image_processing.target_dpi', 300),
-            help="画像の目標解像度"
-        )
+        with col1:
+            batch_size = st.number_input(
+                "バッチサイズ:",
+                min_value=1,
+                max_value=50,
+                value=snap['processing.batch_size'],
+                help="同時に処理するファイル数"
+            )
+            
+            max_workers = st.number_input(
+                "最大ワーカー数:",
+                min_value=1,
+                max_value=16,
+                value=snap['processing.max_workers'],
+                help="並列処理のワーカー数"
+            )
         
-        auto_enhance = st.checkbox(
-            "自動画質向上",
-            value=config.get('image_processing.auto_enhance', True),
-            help="画像の自動補正を有効にする"
-        )
-    
-    with col2:
-        noise_reduction = st.checkbox(
-            "ノイズ除去",
-            value=config.get('image_processing.noise_reduction', True),
-            help="画像のノイズ除去を有効にする"
-        )
+        with col2:
+            timeout_seconds = st.number_input(
+                "タイムアウト（秒）:",
+                min_value=30,
+                max_value=1800,
+                value=snap['processing.timeout_seconds'],
+                help="1ファイルあたりのタイムアウト時間"
+            )
+            
+            retry_attempts = st.number_input(
+                "リトライ回数:",
+                min_value=0,
+                max_value=10,
+                value=snap['processing.retry_attempts'],
+                help="失敗時のリトライ回数"
+            )
         
-        contrast_adjustment = st.checkbox(
-            "コントラスト調整",
-            value=config.get('image_processing.contrast_adjustment', True),
-            help="コントラストの自動調整を有効にする"
-        )
+        # 画像処理設定
+        st.markdown("### 🖼️ 画像処理設定")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            target_dpi = st.number_input(
+                "目標DPI:",
+                min_value=150,
+                max_value=600,
+                value=snap['image_processing.target_dpi'],
+                help="画像の目標解像度"
+            )
+            
+            auto_enhance = st.checkbox(
+                "自動画質向上",
+                value=snap['image_processing.auto_enhance'],
+                help="画像の自動補正を有効にする"
+            )
+        
+        with col2:
+            noise_reduction = st.checkbox(
+                "ノイズ除去",
+                value=snap['image_processing.noise_reduction'],
+                help="画像のノイズ除去を有効にする"
+            )
+            
+            contrast_adjustment = st.checkbox(
+                "コントラスト調整",
+                value=snap['image_processing.contrast_adjustment'],
+                help="コントラストの自動調整を有効にする"
+            )
+            
+        submitted = st.form_submit_button("💾 システム設定保存", type="primary")
     
     # システム設定保存
-    if st.button("💾 システム設定保存", type="primary"):
+    if submitted:
         # ディレクトリ設定更新
         for config_key, new_value in directory_values.items():
             config.update(config_key, new_value)
@@ -346,6 +416,24 @@ def show_system_settings_tab():
         config.update('image_processing.contrast_adjustment', contrast_adjustment)
         
         NotificationManager.show_success("システム設定を保存しました")
+    
+    # ディレクトリ存在確認（作成ボタンはフォーム外に配置）
+    st.markdown("### 📂 ディレクトリ状態")
+    
+    for label, (config_key, _) in directories.items():
+        dir_value = directory_values[config_key]
+        if path_exists(dir_value):
+            st.success(f"✅ {label}: 存在")
+        else:
+            st.warning(f"⚠️ {label}: 存在しません")
+            if st.button(f"📁 {label}作成", key=f"create_{config_key}"):
+                try:
+                    Path(dir_value).mkdir(parents=True, exist_ok=True)
+                    existing_children.clear()
+                    NotificationManager.show_success(f"{label}を作成しました")
+                    st.rerun()
+                except Exception as e:
+                    NotificationManager.show_error(f"ディレクトリ作成エラー: {e}")
 
 def show_database_management_tab():
     """データベース管理タブ"""
@@ -412,8 +500,9 @@ def show_database_info():
         db_path = config.get('database.path', 'database/drawing_analysis.db')
         
         if db_path:
-            db_manager = DatabaseManager(db_path)
-            db_info = db_manager.get_database_info()
+            # マネージャー生成時にDBファイルが作成されるため先に取得
+            db_manager = get_db_manager(db_path)
+            db_info = load_database_info(db_path, db_manager.get_modified_time())
         else:
             raise ValueError("データベースパスが設定されていません")
         
@@ -435,15 +524,7 @@ def show_database_info():
         if 'table_counts' in db_info:
             st.markdown("### 📋 テーブル別レコード数")
             
-            table_data = []
-            for table, count in db_info['table_counts'].items():
-                table_data.append({
-                    'テーブル名': table,
-                    'レコード数': f"{count:,}",
-                    '割合': f"{count/total_records*100:.1f}%" if total_records > 0 else "0%"
-                })
-            
-            df = pd.DataFrame(table_data)
+            df = build_table_counts_df(tuple(db_info['table_counts'].items()), total_records)
             st.dataframe(df, use_container_width=True, hide_index=True)
     
     except Exception as e:
@@ -461,8 +542,9 @@ def optimize_database():
             return
             
         with st.spinner("データベース最適化中..."):
-            db_manager = DatabaseManager(db_path)
+            db_manager = get_db_manager(db_path)
             db_manager.vacuum_database()
+            load_database_info.clear()
         
         NotificationManager.show_success("データベース最適化完了")
     
@@ -481,7 +563,7 @@ def check_database_integrity():
             return
             
         with st.spinner("整合性チェック中..."):
-            db_manager = DatabaseManager(db_path)
+            db_manager = get_db_manager(db_path)
             is_ok = db_manager.check_integrity()
         
         if is_ok:
@@ -504,8 +586,9 @@ def update_database_statistics():
             return
             
         with st.spinner("統計情報更新中..."):
-            db_manager = DatabaseManager(db_path)
+            db_manager = get_db_manager(db_path)
             db_manager.update_statistics()
+            load_database_info.clear()
         
         NotificationManager.show_success("統計情報を更新しました")
     
@@ -524,7 +607,7 @@ def create_database_backup():
             return
             
         with st.spinner("バックアップ作成中..."):
-            db_manager = DatabaseManager(db_path)
+            db_manager = get_db_manager(db_path)
             backup_path = db_manager.backup_database()
         
         NotificationManager.show_success(f"バックアップ作成完了: {backup_path}")
@@ -542,19 +625,17 @@ def show_backup_files():
             backup_dir = Path(backup_dir_str)
             
             if backup_dir.exists():
-                backup_files = list(backup_dir.glob("*.db"))
+                # 1回の走査でDirEntryのstat情報を利用
+                backup_files = []
+                with os.scandir(backup_dir) as it:
+                    for entry in it:
+                        if entry.is_file() and entry.name.endswith('.db'):
+                            stat = entry.stat()
+                            backup_files.append((entry.name, stat.st_size, stat.st_mtime))
                 
                 if backup_files:
-                    backup_data = []
-                    for file_path in sorted(backup_files, reverse=True):
-                        stat = file_path.stat()
-                        backup_data.append({
-                            'ファイル名': file_path.name,
-                            'サイズ': f"{stat.st_size / 1024 / 1024:.2f} MB",
-                            '作成日時': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                        })
-                    
-                    df = pd.DataFrame(backup_data)
+                    backup_files.sort(key=lambda item: item[0], reverse=True)
+                    df = build_backup_files_df(tuple(backup_files))
                     st.dataframe(df, use_container_width=True, hide_index=True)
                 else:
                     st.info("バックアップファイルがありません")
@@ -580,8 +661,9 @@ def cleanup_old_data(days: int):
             return
             
         with st.spinner(f"{days}日より古いデータを削除中..."):
-            db_manager = DatabaseManager(db_path)
+            db_manager = get_db_manager(db_path)
             deleted_count = db_manager.cleanup_old_data(days)
+            load_database_info.clear()
         
         NotificationManager.show_success(f"{deleted_count}件のデータを削除しました")
     
@@ -598,102 +680,109 @@ def show_advanced_settings_tab():
         st.error("設定ファイルが読み込まれていません")
         return
     
-    # ログ設定
-    st.markdown("### 📝 ログ設定")
-    
-    col1, col2 = st.columns(2)
+    # 使用する設定値をまとめて取得
+    snap = config.snapshot(ADVANCED_SETTING_DEFAULTS)
     
-    with col1:
-        log_level = st.selectbox(
-            "ログレベル:",
-            ["DEBUG", "INFO", "WARNING", "ERROR"],
-            index=["DEBUG", "INFO", "WARNING", "ERROR"].index(config.get('logging.level', 'INFO')),
-            help="出力するログのレベル"
-        )
+    # 入力中は再実行しないようフォームにまとめ、保存時のみ反映
+    with st.form("advanced_settings_form"):
+        # ログ設定
+        st.markdown("### 📝 ログ設定")
         
-        max_size_mb = st.number_input(
-            "ログファイル最大サイズ（MB）:",
-            min_value=1,
-            max_value=1000,
-            value=config.get('logging.max_size_mb', 100),
-            help="ログファイルの最大サイズ"
-        )
-    
-    with col2:
-        backup_count = st.number_input(
-            "ログバックアップ数:",
-            min_value=1,
-            max_value=20,
-            value=config.get('logging.backup_count', 5),
-            help="保持するログバックアップファイル数"
-        )
-    
-    # 抽出設定
-    st.markdown("### 🎯 抽出設定")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        confidence_threshold = st.slider(
-            "信頼度閾値:",
-            min_value=0.0,
-            max_value=1.0,
-            value=config.get('extraction.confidence_threshold', 0.7),
-            step=0.05,
-            help="この値以下は低信頼度として扱う"
-        )
+        col1, col2 = st.columns(2)
         
-        auto_correction = st.checkbox(
-            "自動補正",
-            value=config.get('extraction.auto_correction', True),
-            help="既知パターンによる自動補正"
-        )
-    
-    with col2:
-        similarity_threshold = st.slider(
-            "類似度閾値:",
-            min_value=0.0,
-            max_value=1.0,
-            value=config.get('learning.similarity_threshold', 0.85),
-            step=0.05,
-            help="テンプレート選択の類似度閾値"
-        )
+        with col1:
+            log_level = st.selectbox(
+                "ログレベル:",
+                LOG_LEVEL_OPTIONS,
+                index=LOG_LEVEL_INDEX.get(snap['logging.level'], LOG_LEVEL_INDEX['INFO']),
+                help="出力するログのレベル"
+            )
+            
+            max_size_mb = st.number_input(
+                "ログファイル最大サイズ（MB）:",
+                min_value=1,
+                max_value=1000,
+                value=snap['logging.max_size_mb'],
+                help="ログファイルの最大サイズ"
+            )
         
-        auto_learning = st.checkbox(
-            "自動学習",
-            value=config.get('learning.auto_learning', True),
-            help="解析結果の自動学習"
-        )
-    
-    # UI設定
-    st.markdown("### 🖥️ UI設定")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        show_tips = st.checkbox(
-            "ヒント表示",
-            value=config.get('ui.show_tips', True),
-            help="操作のヒントを表示"
-        )
+        with col2:
+            backup_count = st.number_input(
+                "ログバックアップ数:",
+                min_value=1,
+                max_value=20,
+                value=snap['logging.backup_count'],
+                help="保持するログバックアップファイル数"
+            )
         
-        sidebar_state = st.selectbox(
-            "サイドバー初期状態:",
-            ["expanded", "collapsed"],
-            index=0 if config.get('ui.sidebar_state', 'expanded') == 'expanded' else 1,
-            help="サイドバーの初期表示状態"
-        )
-    
-    with col2:
-        theme = st.selectbox(
-            "テーマ:",
-            ["light", "dark"],
-            index=0 if config.get('ui.theme', 'light') == 'light' else 1,
-            help="UIのテーマ"
-        )
+        # 抽出設定
+        st.markdown("### 🎯 抽出設定")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            confidence_threshold = st.slider(
+                "信頼度閾値:",
+                min_value=0.0,
+                max_value=1.0,
+                value=snap['extraction.confidence_threshold'],
+                step=0.05,
+                help="この値以下は低信頼度として扱う"
+            )
+            
+            auto_correction = st.checkbox(
+                "自動補正",
+                value=snap['extraction.auto_correction'],
+                help="既知パターンによる自動補正"
+            )
+        
+        with col2:
+            similarity_threshold = st.slider(
+                "類似度閾値:",
+                min_value=0.0,
+                max_value=1.0,
+                value=snap['learning.similarity_threshold'],
+                step=0.05,
+                help="テンプレート選択の類似度閾値"
+            )
+            
+            auto_learning = st.checkbox(
+                "自動学習",
+                value=snap['learning.auto_learning'],
+                help="解析結果の自動学習"
+            )
+        
+        # UI設定
+        st.markdown("### 🖥️ UI設定")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            show_tips = st.checkbox(
+                "ヒント表示",
+                value=snap['ui.show_tips'],
+                help="操作のヒントを表示"
+            )
+            
+            sidebar_state = st.selectbox(
+                "サイドバー初期状態:",
+                SIDEBAR_STATE_OPTIONS,
+                index=SIDEBAR_STATE_INDEX.get(snap['ui.sidebar_state'], 1),
+                help="サイドバーの初期表示状態"
+            )
+        
+        with col2:
+            theme = st.selectbox(
+                "テーマ:",
+                THEME_OPTIONS,
+                index=THEME_INDEX.get(snap['ui.theme'], 1),
+                help="UIのテーマ"
+            )
+        
+        submitted = st.form_submit_button("💾 詳細設定保存", type="primary")
     
     # 詳細設定保存
-    if st.button("💾 詳細設定保存", type="primary"):
+    if submitted:
         # ログ設定
         config.update('logging.level', log_level)
         config.update('logging.max_size_mb', max_size_mb)
@@ -736,12 +825,12 @@ def export_settings():
         config = st.session_state.config
         
         # APIキーは除外してエクスポート
-        export_config = config.config.copy()
+        export_config = copy.deepcopy(config.config)
         if 'openai' in export_config and 'api_key' in export_config['openai']:
             export_config['openai']['api_key'] = 'your-openai-api-key-here'
         
         import yaml
-        config_yaml = yaml.dump(export_config, default_flow_style=False, allow_unicode=True)
+        config_yaml = yaml.dump(export_config, Dumper=YamlDumper, default_flow_style=False, allow_unicode=True)
         
         st.download_button(
             label="📥 設定ファイルダウンロード",
@@ -777,7 +866,7 @@ def import_settings(uploaded_file):
         import yaml
         
         # ファイル内容読み込み
-        config_data = yaml.safe_load(uploaded_file.getvalue())
+        config_data = yaml.load(uploaded_file.getvalue(), Loader=YamlLoader)
         
         # 現在の設定を更新
         config = st.session_state.config
@@ -3,7 +3,7 @@
 import streamlit as st
 import pandas as pd
 import uuid
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import plotly.express as px
 import json
@@ -11,7 +11,81 @@ import json
 from src.utils.config import SystemConfig
 from src.utils.database import DatabaseManager
 from src.models.template import DrawingTemplate
-from src.ui.components import NotificationManager, MetricsDisplay
+from src.ui.components import NotificationManager, MetricsDisplay, get_db_manager, ORJSON_SUPPORT
+
+# ページ内のタブ
+TEMPLATE_TABS = ("📋 テンプレート一覧", "➕ 新規作成", "📊 統計")
+
+# 一覧表に表示する列と表示名
+TEMPLATE_LIST_COLUMNS = {
+    'template_id': 'ID',
+    'template_name': 'テンプレート名',
+    'product_type': '製品タイプ',
+    'orientation': '向き',
+    'field_count': 'フィールド数',
+    'confidence_threshold': '信頼度閾値'
+}
+
+# フィールドのデータ型
+FIELD_TYPE_OPTIONS = ("テキスト", "数値", "日付", "選択肢")
+
+# フィールド定義表の列
+FIELD_COLUMNS = ('name', 'type', 'required')
+
+# 表に表示する最大行数
+MAX_LIST_ROWS = 200
+MAX_USAGE_ROWS = 100
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_templates(db_path: str, product_type: Optional[str]) -> List[Dict[str, Any]]:
+    """製品タイプ別のテンプレート概要を取得（更新されるまで最大60秒間再利用）"""
+    return get_db_manager(db_path).get_template_summaries(product_type)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_product_types(db_path: str) -> List[str]:
+    """テンプレートの製品タイプ一覧を取得（更新されるまで最大60秒間再利用）"""
+    return get_db_manager(db_path).get_distinct_product_types()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_template_statistics(db_path: str) -> List[Dict[str, Any]]:
+    """製品タイプ別のテンプレート統計を取得（更新されるまで最大60秒間再利用）"""
+    return get_db_manager(db_path).get_template_statistics()
+
+@st.cache_data(ttl=24 * 60 * 60, max_entries=16, show_spinner=False)
+def build_product_type_fig(product_types: Tuple[str, ...], counts: Tuple[int, ...]):
+    """製品タイプ別テンプレート数の棒グラフを作成（集計値が同じ間は再利用）"""
+    df = pd.DataFrame({
+        '製品タイプ': product_types,
+        'テンプレート数': counts
+    })
+    
+    return px.bar(
+        df, 
+        x='製品タイプ', 
+        y='テンプレート数',
+        title="製品タイプ別テンプレート数"
+    )
+
+@st.cache_data(ttl=24 * 60 * 60, max_entries=16, show_spinner=False)
+def build_usage_fig(template_names: Tuple[str, ...], usage_counts: Tuple[int, ...]):
+    """テンプレート使用割合の円グラフを作成（集計値が同じ間は再利用）"""
+    df = pd.DataFrame({
+        'テンプレート名': template_names,
+        '使用回数': usage_counts
+    })
+    
+    return px.pie(
+        df, 
+        names='テンプレート名', 
+        values='使用回数',
+        title="テンプレート使用割合"
+    )
+
+def clear_template_cache():
+    """テンプレート関連のキャッシュを破棄"""
+    load_templates.clear()
+    load_product_types.clear()
+    load_template_statistics.clear()
 
 def show():
     """テンプレート管理ページを表示"""
@@ -28,46 +102,51 @@ def show():
     if 'template_filter' not in st.session_state:
         st.session_state.template_filter = 'all'
     
+    if 'pending_delete' not in st.session_state:
+        st.session_state.pending_delete = None  # 削除確認中のテンプレート（ID, 使用件数）
+    
     # データベース接続
     config = SystemConfig()
-    db_manager = DatabaseManager(config.get('database.path'))
-    
-    # タブ
-    tab1, tab2, tab3 = st.tabs(["📋 テンプレート一覧", "➕ 新規作成", "📊 統計"])
+    db_manager = get_db_manager(config.get('database.path'))
+    
+    # タブ（st.tabsは全タブを毎回実行するため、選択中の画面のみ描画する）
+    active_tab = st.radio(
+        "表示",
+        TEMPLATE_TABS,
+        horizontal=True,
+        key="template_tab",
+        label_visibility="collapsed"
+    )
     
-    with tab1:
+    if active_tab == TEMPLATE_TABS[0]:
         show_template_list(db_manager)
     
-    with tab2:
+    elif active_tab == TEMPLATE_TABS[1]:
         show_template_creation()
     
-    with tab3:
+    else:
         show_template_statistics(db_manager)
 
 def show_template_list(db_manager: DatabaseManager):
     """テンプレート一覧を表示"""
     
-    # フィルター
-    product_types = ["すべて"]
-    templates_by_type = db_manager.get_templates_by_type(None)
+    # フィルター（フォームにまとめ、「適用」を押したときだけ再実行する）
+    product_types = ["すべて"] + load_product_types(db_manager.database_path)
     
-    # 製品タイプのリストを作成
-    for template in templates_by_type:
-        if template['product_type'] not in product_types:
-            product_types.append(template['product_type'])
+    with st.form("template_filter_form"):
+        selected_type = st.selectbox(
+            "製品タイプでフィルター:",
+            product_types,
+            index=0
+        )
+        st.form_submit_button("適用")
     
-    selected_type = st.selectbox(
-        "製品タイプでフィルター:",
-        product_types,
-        index=0
+    # テンプレート一覧を取得（load_templatesのキャッシュにより最大60秒間再利用）
+    templates = load_templates(
+        db_manager.database_path,
+        None if selected_type == "すべて" else selected_type
     )
     
-    # テンプレート一覧を取得
-    if selected_type == "すべて":
-        templates = templates_by_type
-    else:
-        templates = db_manager.get_templates_by_type(selected_type)
-    
     if not templates:
         st.info("テンプレートが登録されていません。「新規作成」タブから作成してください。")
         return
@@ -75,27 +154,22 @@ def show_template_list(db_manager: DatabaseManager):
     # テンプレート一覧表示
     st.subheader(f"テンプレート一覧 ({len(templates)}件)")
     
-    # データフレーム用のデータ作成
-    template_data = []
-    for template in templates:
-        template_data.append({
-            'ID': template['template_id'],
-            'テンプレート名': template['template_name'],
-            '製品タイプ': template['product_type'],
-            '向き': template['orientation'],
-            'フィールド数': len(template['fields']),
-            '信頼度閾値': f"{template['confidence_threshold']:.1%}"
-        })
+    # データフレームを一括作成（表示する列のみ）
+    df = pd.DataFrame.from_records(templates, columns=list(TEMPLATE_LIST_COLUMNS))
+    df['confidence_threshold'] = df['confidence_threshold'].map('{:.1%}'.format)
+    df = df.rename(columns=TEMPLATE_LIST_COLUMNS)
     
-    if template_data:
-        df = pd.DataFrame(template_data)
-        st.dataframe(df, use_container_width=True)
+    if not df.empty:
+        st.dataframe(df.head(MAX_LIST_ROWS), use_container_width=True)
+        if len(df) > MAX_LIST_ROWS:
+            st.caption(f"全{len(df)}件中、先頭{MAX_LIST_ROWS}件を表示しています")
         
-        # テンプレート選択
+        # テンプレート選択（ID→名前は辞書で引く）
+        id_to_name = {t['template_id']: t['template_name'] for t in templates}
         selected_template_id = st.selectbox(
             "詳細表示するテンプレートを選択:",
-            [t['ID'] for t in template_data],
-            format_func=lambda x: next((t['テンプレート名'] for t in template_data if t['ID'] == x), x)
+            list(id_to_name),
+            format_func=lambda x: id_to_name.get(x, x)
         )
         
         if selected_template_id:
@@ -105,26 +179,95 @@ def show_template_list(db_manager: DatabaseManager):
             with col1:
                 if st.button("詳細表示", use_container_width=True):
                     st.session_state.template_action = 'view'
-                    st.rerun()
             
             with col2:
                 if st.button("編集", use_container_width=True):
                     st.session_state.template_action = 'edit'
-                    st.rerun()
             
             with col3:
                 if st.button("削除", use_container_width=True, type="primary", help="このテンプレートを削除します"):
-                    if delete_template(db_manager, selected_template_id):
+                    # 未使用なら削除し、使用中なら確認を求める（確認待ちの間はDB接続を保持しない）
+                    deleted, usage_count = delete_template(db_manager, selected_template_id)
+                    
+                    if deleted:
+                        st.success("テンプレートを削除しました")
+                        st.rerun()
+                    elif usage_count > 0:
+                        st.session_state.pending_delete = (selected_template_id, usage_count)
+            
+            # 使用中テンプレートの削除確認
+            pending_delete = st.session_state.pending_delete
+            if pending_delete and pending_delete[0] == selected_template_id:
+                confirm_panel = st.empty()
+                with confirm_panel.container():
+                    st.warning(f"このテンプレートは{pending_delete[1]}件の解析で使用されています。削除しますか？")
+                    
+                    confirm_col, cancel_col = st.columns(2)
+                    with confirm_col:
+                        confirmed = st.button("削除する", key="confirm_delete", use_container_width=True, type="primary")
+                    with cancel_col:
+                        cancelled = st.button("削除しない", key="cancel_delete", use_container_width=True)
+                
+                if confirmed:
+                    st.session_state.pending_delete = None
+                    # 一覧の再描画が必要なため再実行（キャッシュは削除時に破棄済み）
+                    deleted, _ = delete_template(db_manager, selected_template_id, force=True)
+                    if deleted:
                         st.success("テンプレートを削除しました")
                         st.rerun()
+                elif cancelled:
+                    st.session_state.pending_delete = None
+                    confirm_panel.empty()
+    
+    # 詳細・編集パネル（一覧に戻る際は再実行せずパネルだけ消す）
+    action_panel = st.empty()
     
     # テンプレート詳細表示
     if st.session_state.template_action == 'view' and st.session_state.current_template_id:
-        show_template_details(db_manager, st.session_state.current_template_id)
+        with action_panel.container():
+            show_template_details(db_manager, st.session_state.current_template_id)
     
     # テンプレート編集
     elif st.session_state.template_action == 'edit' and st.session_state.current_template_id:
-        edit_template(db_manager, st.session_state.current_template_id)
+        with action_panel.container():
+            edit_template(db_manager, st.session_state.current_template_id)
+    
+    if st.session_state.template_action == 'list':
+        action_panel.empty()
+
+def field_editor(fields: List[Dict[str, Any]], key: str) -> List[Dict[str, Any]]:
+    """抽出フィールド定義を1つの表形式エディタで編集し、名前のある行を返す"""
+    
+    fields_df = pd.DataFrame.from_records(
+        fields or [{'name': '', 'type': FIELD_TYPE_OPTIONS[0], 'required': True}],
+        columns=list(FIELD_COLUMNS)
+    )
+    
+    edited_df = st.data_editor(
+        fields_df,
+        num_rows="dynamic",
+        use_container_width=True,
+        column_config={
+            'name': st.column_config.TextColumn("フィールド名"),
+            'type': st.column_config.SelectboxColumn(
+                "データ型",
+                options=list(FIELD_TYPE_OPTIONS),
+                default=FIELD_TYPE_OPTIONS[0]
+            ),
+            'required': st.column_config.CheckboxColumn("必須", default=True)
+        },
+        key=key
+    )
+    
+    return [
+        {
+            'name': field['name'],
+            'type': field['type'] if field['type'] in FIELD_TYPE_OPTIONS else FIELD_TYPE_OPTIONS[0],
+            'required': bool(field['required'])
+        }
+        for field in edited_df.to_dict('records')
+        if isinstance(field['name'], str) and field['name'].strip()
+    ]
 
 def show_template_creation():
     """テンプレート作成フォームを表示"""
@@ -154,28 +297,7 @@ def show_template_creation():
         # フィールド定義
         st.subheader("抽出フィールド定義")
         
-        field_count = st.number_input("フィールド数", min_value=1, max_value=20, value=5)
-        
-        fields = []
-        for i in range(field_count):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                field_name = st.text_input(f"フィールド名 {i+1}", key=f"field_name_{i}")
-            
-            with col2:
-                field_type = st.selectbox(
-                    f"データ型 {i+1}",
-                    ["テキスト", "数値", "日付", "選択肢"],
-                    key=f"field_type_{i}"
-                )
-            
-            if field_name:
-                fields.append({
-                    'name': field_name,
-                    'type': field_type,
-                    'required': True
-                })
+        fields = field_editor([], key="fields_editor")
         
         # 送信ボタン
         submit_button = st.form_submit_button("テンプレートを作成")
@@ -201,7 +323,6 @@ def show_template_creation():
                     
                     # 一覧に戻る
                     st.session_state.template_action = 'list'
-                    st.rerun()
 
 def show_template_details(db_manager: DatabaseManager, template_id: str):
     """テンプレート詳細を表示"""
@@ -238,7 +359,8 @@ def show_template_details(db_manager: DatabaseManager, template_id: str):
         })
     
     if field_data:
-        st.dataframe(pd.DataFrame(field_data), use_container_width=True)
+        # 少数行の読み取り専用表のため、インタラクティブなグリッドではなく静的な表で表示
+        st.table(field_data)
     
     # レイアウト特徴
     if template.get('layout_features'):
@@ -248,7 +370,6 @@ def show_template_details(db_manager: DatabaseManager, template_id: str):
     # 戻るボタン
     if st.button("一覧に戻る"):
         st.session_state.template_action = 'list'
-        st.rerun()
 
 def edit_template(db_manager: DatabaseManager, template_id: str):
     """テンプレート編集フォームを表示"""
@@ -284,45 +405,7 @@ def edit_template(db_manager: DatabaseManager, template_id: str):
         # フィールド定義
         st.subheader("抽出フィールド定義")
         
-        # 既存フィールド
-        existing_fields = template['fields']
-        field_count = st.number_input("フィールド数", min_value=1, max_value=20, value=len(existing_fields))
-        
-        fields = []
-        for i in range(field_count):
-            col1, col2, col3 = st.columns([3, 2, 1])
-            
-            # 既存フィールドの値を取得
-            existing_field = existing_fields[i] if i < len(existing_fields) else {'name': '', 'type': 'テキスト', 'required': True}
-            
-            with col1:
-                field_name = st.text_input(
-                    f"フィールド名 {i+1}", 
-                    value=existing_field.get('name', ''),
-                    key=f"edit_field_name_{i}"
-                )
-            
-            with col2:
-                field_type = st.selectbox(
-                    f"データ型 {i+1}",
-                    ["テキスト", "数値", "日付", "選択肢"],
-                    index=["テキスト", "数値", "日付", "選択肢"].index(existing_field.get('type', 'テキスト')),
-                    key=f"edit_field_type_{i}"
-                )
-            
-            with col3:
-                field_required = st.checkbox(
-                    "必須",
-                    value=existing_field.get('required', True),
-                    key=f"edit_field_required_{i}"
-                )
-            
-            if field_name:
-                fields.append({
-                    'name': field_name,
-                    'type': field_type,
-                    'required': field_required
-                })
+        fields = field_editor(template['fields'], key="edit_fields_editor")
         
         # 送信ボタン
         submit_button = st.form_submit_button("テンプレートを更新")
@@ -343,6 +426,7 @@ def edit_template(db_manager: DatabaseManager, template_id: str):
                 
                 try:
                     db_manager.update_template(template_id, template_data)
+                    clear_template_cache()
                     st.success(f"テンプレート「{template_name}」を更新しました")
                     
                     # 一覧に戻る
@@ -354,73 +438,45 @@ def edit_template(db_manager: DatabaseManager, template_id: str):
     # 戻るボタン
     if st.button("キャンセル"):
         st.session_state.template_action = 'list'
-        st.rerun()
 
 def create_template(template_data: Dict[str, Any]) -> bool:
     """テンプレートを作成"""
+    return create_templates([template_data])
+
+def create_templates(templates_data: List[Dict[str, Any]]) -> bool:
+    """テンプレートを一括作成"""
     
     try:
         config = SystemConfig()
-        db_manager = DatabaseManager(config.get('database.path'))
+        db_manager = get_db_manager(config.get('database.path'))
         
-        # テンプレートテーブルに挿入
-        with db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-            INSERT INTO templates (
-                template_id, template_name, product_type, orientation,
-                fields, confidence_threshold
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                template_data['template_id'],
-                template_data['template_name'],
-                template_data['product_type'],
-                template_data['orientation'],
-                json.dumps(template_data['fields']),
-                template_data['confidence_threshold']
-            ))
-            
-            conn.commit()
+        # テンプレートテーブルに1トランザクションで挿入
+        db_manager.create_templates(templates_data)
         
+        clear_template_cache()
         return True
     
     except Exception as e:
         st.error(f"テンプレート作成エラー: {e}")
         return False
 
-def delete_template(db_manager: DatabaseManager, template_id: str) -> bool:
-    """テンプレートを削除"""
+def delete_template(db_manager: DatabaseManager, template_id: str, force: bool = False) -> Tuple[bool, int]:
+    """テンプレートを削除（使用中のテンプレートはforce=Trueのときのみ削除）
+    
+    Returns:
+        (削除したかどうか, 使用件数)
+    """
     
     try:
-        with db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # 使用状況確認
-            cursor.execute("""
-            SELECT COUNT(*) FROM analysis_results
-            WHERE template_id = ?
-            """, (template_id,))
-            
-            usage_count = cursor.fetchone()[0]
-            
-            if usage_count > 0:
-                if not st.warning(f"このテンプレートは{usage_count}件の解析で使用されています。削除しますか？"):
-                    return False
-            
-            # 削除実行
-            cursor.execute("""
-            DELETE FROM templates
-            WHERE template_id = ?
-            """, (template_id,))
-            
-            conn.commit()
-            
-            return True
+        deleted, usage_count = db_manager.delete_template(template_id, force=force)
+        
+        if deleted:
+            clear_template_cache()
+        return deleted, usage_count
     
     except Exception as e:
         st.error(f"テンプレート削除エラー: {e}")
-        return False
+        return False, 0
 
 def show_template_statistics(db_manager: DatabaseManager):
     """テンプレート統計を表示"""
@@ -428,50 +484,38 @@ def show_template_statistics(db_manager: DatabaseManager):
     st.subheader("テンプレート統計")
     
     try:
-        # テンプレート数
-        templates = db_manager.get_templates_by_type(None)
+        # 製品タイプ別の件数・平均フィールド数（SQL側で集計）
+        type_stats = load_template_statistics(db_manager.database_path)
         
-        if not templates:
+        if not type_stats:
             st.info("テンプレートが登録されていません")
             return
         
+        total_templates = sum(row['template_count'] for row in type_stats)
+        
         # 基本統計
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("総テンプレート数", len(templates))
-        
-        # 製品タイプ別集計
-        product_types = {}
-        for template in templates:
-            product_type = template['product_type']
-            product_types[product_type] = product_types.get(product_type, 0) + 1
+            st.metric("総テンプレート数", total_templates)
         
         with col2:
-            st.metric("製品タイプ数", len(product_types))
+            st.metric("製品タイプ数", len(type_stats))
         
         # フィールド数の平均
-        total_fields = sum(len(template['fields']) for template in templates)
-        avg_fields = total_fields / len(templates) if templates else 0
+        total_fields = sum(row['template_count'] * row['avg_fields'] for row in type_stats)
+        avg_fields = total_fields / total_templates
         
         with col3:
             st.metric("平均フィールド数", f"{avg_fields:.1f}")
         
         # 製品タイプ別グラフ
-        if product_types:
-            df = pd.DataFrame({
-                '製品タイプ': list(product_types.keys()),
-                'テンプレート数': list(product_types.values())
-            })
-            
-            fig = px.bar(
-                df, 
-                x='製品タイプ', 
-                y='テンプレート数',
-                title="製品タイプ別テンプレート数"
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+        fig = build_product_type_fig(
+            tuple(row['product_type'] for row in type_stats),
+            tuple(row['template_count'] for row in type_stats)
+        )
+        
+        st.plotly_chart(fig, use_container_width=True)
         
         # テンプレート使用状況
         st.subheader("テンプレート使用状況")
@@ -488,23 +532,18 @@ def show_template_statistics(db_manager: DatabaseManager):
             ORDER BY usage_count DESC
             """)
             
-            usage_data = []
-            for row in cursor.fetchall():
-                usage_data.append({
-                    'テンプレート名': row[0],
-                    '使用回数': row[1]
-                })
+            usage_df = pd.DataFrame.from_records(cursor.fetchall(), columns=['テンプレート名', '使用回数'])
             
-            if usage_data:
-                usage_df = pd.DataFrame(usage_data)
-                st.dataframe(usage_df, use_container_width=True)
+            if not usage_df.empty:
+                # 表は上位のみ表示し、円グラフは全テンプレートの集計から作成
+                st.dataframe(usage_df.head(MAX_USAGE_ROWS), use_container_width=True)
+                if len(usage_df) > MAX_USAGE_ROWS:
+                    st.caption(f"全{len(usage_df)}件中、使用回数上位{MAX_USAGE_ROWS}件を表示しています")
                 
                 # 使用回数グラフ
-                fig = px.pie(
-                    usage_df, 
-                    names='テンプレート名', 
-                    values='使用回数',
-                    title="テンプレート使用割合"
+                fig = build_usage_fig(
+                    tuple(usage_df['テンプレート名']),
+                    tuple(usage_df['使用回数'])
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
@@ -519,38 +558,42 @@ def import_template():
     
     st.subheader("テンプレートインポート")
     
-    uploaded_file = st.file_uploader(
+    uploaded_files = st.file_uploader(
         "テンプレートJSONファイル",
         type=['json'],
-        help="エクスポートしたテンプレートJSONファイルをアップロード"
+        accept_multiple_files=True,
+        help="エクスポートしたテンプレートJSONファイルをアップロード（複数選択可）"
     )
     
-    if uploaded_file:
+    if uploaded_files:
         try:
-            template_data = json.load(uploaded_file)
-            
-            # 基本検証
-            required_fields = ['template_name', 'product_type', 'orientation', 'fields']
-            for field in required_fields:
-                if field not in template_data:
-                    st.error(f"テンプレートに必須フィールド '{field}' がありません")
-                    return
-            
-            # IDがない場合は新規作成
-            if 'template_id' not in template_data:
-                template_data['template_id'] = str(uuid.uuid4())
-            
-            # 信頼度閾値がない場合はデフォルト値
-            if 'confidence_threshold' not in template_data:
-                template_data['confidence_threshold'] = 0.7
+            templates_data = []
+            for uploaded_file in uploaded_files:
+                template_data = json.load(uploaded_file)
+                
+                # 基本検証
+                required_fields = ['template_name', 'product_type', 'orientation', 'fields']
+                for field in required_fields:
+                    if field not in template_data:
+                        st.error(f"{uploaded_file.name}: テンプレートに必須フィールド '{field}' がありません")
+                        return
+                
+                # IDがない場合は新規作成
+                if 'template_id' not in template_data:
+                    template_data['template_id'] = str(uuid.uuid4())
+                
+                # 信頼度閾値がない場合はデフォルト値
+                if 'confidence_threshold' not in template_data:
+                    template_data['confidence_threshold'] = 0.7
+                
+                templates_data.append(template_data)
             
-            # テンプレート作成
-            if create_template(template_data):
-                st.success(f"テンプレート「{template_data['template_name']}」をインポートしました")
+            # テンプレート作成（まとめて挿入）
+            if create_templates(templates_data):
+                st.success(f"{len(templates_data)}件のテンプレートをインポートしました")
                 
                 # 一覧に戻る
                 st.session_state.template_action = 'list'
-                st.rerun()
         
         except Exception as e:
             st.error(f"テンプレートインポートエラー: {e}")
@@ -564,8 +607,12 @@ def export_template(db_manager: DatabaseManager, template_id: str):
         st.error("テンプレートが見つかりません")
         return
     
-    # JSONに変換
-    template_json = json.dumps(template, indent=2, ensure_ascii=False)
+    # JSONに変換（orjsonが使える場合はバイト列に直接変換）
+    if ORJSON_SUPPORT:
+        import orjson
+        template_json = orjson.dumps(template, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        template_json = json.dumps(template, indent=2, ensure_ascii=False)
     
     # ダウンロードボタン
     st.download_button(
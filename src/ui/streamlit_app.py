@@ -5,20 +5,22 @@ import sys
 from pathlib import Path
 import logging
 import json
+import time
+import importlib
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 import tempfile
 from PIL import Image
 import io
 
-# プロジェクトルートをパスに追加
-project_root = Path(__file__).parent.parent.parent
-sys.path.append(str(project_root))
+# プロジェクトルートをパスに追加（streamlit runで直接起動された場合のみ必要）
+project_root = str(Path(__file__).resolve().parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
-from src.ui.pages import analysis, batch, settings, templates
 from src.utils.config import SystemConfig
 from src.ui import components
-from src.ui.components import ErrorLogger
+from src.ui.components import ErrorLogger, get_db_manager
 from src.models.drawing import ProductType
 
 # ページ設定
@@ -34,8 +36,8 @@ st.set_page_config(
     }
 )
 
-# カスタムCSS
-st.markdown("""
+# カスタムCSS（描画はmain()で行う）
+CUSTOM_CSS = """
 <style>
 /* メインスタイル */
 .main-header {
@@ -182,7 +184,64 @@ st.markdown("""
     margin-top: 3rem;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# 部分再実行（st.fragment）が使えない古いStreamlitでは通常の関数として実行
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+# ページと表示アイコン、ページ名から選択位置への対応表
+PAGE_ICONS = {
+    "図面解析": "🔍",
+    "テンプレート管理": "📋", 
+    "バッチ処理": "🔄",
+    "システム設定": "⚙️"
+}
+PAGE_OPTIONS = tuple(PAGE_ICONS)
+
+# ページごとのモジュール（表示するページのみ読み込む）
+PAGE_MODULES = {
+    "図面解析": "src.ui.pages.analysis",
+    "テンプレート管理": "src.ui.pages.templates",
+    "バッチ処理": "src.ui.pages.batch",
+    "システム設定": "src.ui.pages.settings"
+}
+PAGE_INDEX = {name: i for i, name in enumerate(PAGE_OPTIONS)}
+
+# 処理状態ごとの表示アイコン
+STATUS_ICONS = {
+    '待機中': '🟡',
+    '処理中': '🔵', 
+    '完了': '🟢',
+    'エラー': '🔴'
+}
+
+# ヒント一覧
+TIPS = (
+    "💡 **品質向上のコツ**: 図面は300DPI以上、A4サイズで準備すると精度が向上します",
+    "🎯 **効率化**: 同じ種類の図面は一度テンプレートを作成すると次回から高速処理できます",
+    "📊 **信頼度**: 80%以上の信頼度が理想的です。低い場合は手動修正をお勧めします",
+    "🔄 **学習機能**: 修正したデータは自動的に学習され、次回の精度向上に活用されます"
+)
+
+# ヒントを切り替える間隔（秒）
+TIP_ROTATE_SECONDS = 30
+
+# 設定ファイルのパス
+CONFIG_PATH = "config.yaml"
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_config_data(config_path: str, config_mtime: Optional[float]) -> Dict[str, Any]:
+    """設定ファイルを読み込み（ファイルが更新されるまでは解析結果を再利用）"""
+    return SystemConfig(config_path).config
+
+def get_config(config_path: str, config_mtime: Optional[float]) -> SystemConfig:
+    """セッション専用の設定を取得（cache_dataが返すコピーを使うため他セッションと共有しない）"""
+    return SystemConfig(config_path, config_data=load_config_data(config_path, config_mtime))
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_analysis_statistics(db_path: str) -> Dict[str, Any]:
+    """解析統計を取得（最大60秒間再利用）"""
+    return get_db_manager(db_path).get_analysis_statistics()
 
 def initialize_session_state():
     """セッション状態を初期化"""
@@ -190,7 +249,9 @@ def initialize_session_state():
     # 設定
     if 'config' not in st.session_state:
         try:
-            st.session_state.config = SystemConfig()
+            config_file = Path(CONFIG_PATH)
+            config_mtime = config_file.stat().st_mtime if config_file.exists() else None
+            st.session_state.config = get_config(CONFIG_PATH, config_mtime)
         except Exception as e:
             st.error(f"設定ファイル読み込みエラー: {e}")
             st.session_state.config = None
@@ -268,70 +329,29 @@ def show_sidebar():
         """, unsafe_allow_html=True)
         
         # ページ選択
-        pages = {
-            "図面解析": "🔍",
-            "テンプレート管理": "📋", 
-            "バッチ処理": "🔄",
-            "システム設定": "⚙️"
-        }
-        
         selected_page = st.selectbox(
             "ページを選択:",
-            list(pages.keys()),
-            index=list(pages.keys()).index(st.session_state.current_page),
-            format_func=lambda x: f"{pages[x]} {x}"
+            PAGE_OPTIONS,
+            index=PAGE_INDEX.get(st.session_state.current_page, 0),
+            format_func=lambda x: f"{PAGE_ICONS[x]} {x}"
         )
         
-        st.markdown("---")
-        
-        # システム状態
-        st.markdown("""
-        <div class="sidebar-section">
-            <h4>📊 システム状態</h4>
-        </div>
-        """, unsafe_allow_html=True)
-        
         # 処理状況
-        status_color = {
-            '待機中': '🟡',
-            '処理中': '🔵', 
-            '完了': '🟢',
-            'エラー': '🔴'
-        }.get(st.session_state.processing_status, '⚪')
-        
-        st.markdown(f"**処理状態:** {status_color} {st.session_state.processing_status}")
-        
-        # 統計情報
-        stats = st.session_state.system_stats
-        col1, col2 = st.columns(2)
+        status_color = STATUS_ICONS.get(st.session_state.processing_status, '⚪')
         
-        with col1:
-            st.metric("総解析数", stats['total_analyses'])
-            st.metric("テンプレート", stats['template_count'])
-        
-        with col2:
-            st.metric("今日の解析", stats['today_analyses'])
-            st.metric("平均信頼度", f"{stats['avg_confidence']:.1%}")
-        
-        st.markdown("---")
+        # 区切り線・システム状態見出し・処理状態をまとめて描画
+        st.markdown(f"""
+        ---
         
-        # クイックアクション
-        st.markdown("""
         <div class="sidebar-section">
-            <h4>⚡ クイックアクション</h4>
+            <h4>📊 システム状態</h4>
         </div>
-        """, unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
         
-        with col1:
-            if st.button("🔍 新規解析", use_container_width=True):
-                st.session_state.current_page = "図面解析"
-                st.rerun()
+        **処理状態:** {status_color} {st.session_state.processing_status}
+        """, unsafe_allow_html=True)
         
-        with col2:
-            if st.button("📊 統計確認", use_container_width=True):
-                show_quick_stats()
+        # 統計情報・クイックアクション（操作時はこの部分のみ再実行）
+        show_sidebar_stats()
         
         # グローバルファイルアップロード
         st.markdown("### 📁 ファイル選択")
@@ -356,15 +376,54 @@ def show_sidebar():
         
         return selected_page
 
+@fragment
+def show_sidebar_stats():
+    """サイドバーの統計情報とクイックアクションを表示"""
+    
+    # システム統計読み込み
+    load_system_stats()
+    
+    stats = st.session_state.system_stats
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.metric("総解析数", stats['total_analyses'])
+        st.metric("テンプレート", stats['template_count'])
+    
+    with col2:
+        st.metric("今日の解析", stats['today_analyses'])
+        st.metric("平均信頼度", f"{stats['avg_confidence']:.1%}")
+    
+    # キャッシュはクリック時のコールバックで破棄し、続く再実行で最新値を表示
+    st.button("🔄 統計を更新", use_container_width=True, on_click=load_analysis_statistics.clear)
+    
+    # 区切り線とクイックアクション見出しをまとめて描画
+    st.markdown("""
+    ---
+    
+    <div class="sidebar-section">
+        <h4>⚡ クイックアクション</h4>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        if st.button("🔍 新規解析", use_container_width=True):
+            st.session_state.current_page = "図面解析"
+            st.rerun()
+    
+    with col2:
+        if st.button("📊 統計確認", use_container_width=True):
+            show_quick_stats()
+
 def show_quick_stats():
     """クイック統計を表示"""
     
     with st.expander("📈 詳細統計", expanded=True):
         try:
             if st.session_state.config:
-                from src.utils.database import DatabaseManager
-                db_manager = DatabaseManager(st.session_state.config.get('database.path'))
-                stats = db_manager.get_analysis_statistics()
+                stats = load_analysis_statistics(st.session_state.config.get('database.path'))
                 
                 if stats:
                     # 全体統計
@@ -392,23 +451,20 @@ def show_tips():
     if not st.session_state.ui_settings.get('show_tips', True):
         return
     
-    tips = [
-        "💡 **品質向上のコツ**: 図面は300DPI以上、A4サイズで準備すると精度が向上します",
-        "🎯 **効率化**: 同じ種類の図面は一度テンプレートを作成すると次回から高速処理できます",
-        "📊 **信頼度**: 80%以上の信頼度が理想的です。低い場合は手動修正をお勧めします",
-        "🔄 **学習機能**: 修正したデータは自動的に学習され、次回の精度向上に活用されます"
-    ]
+    # 一定時間ごとに次のヒントへ切り替え（それ以外の再実行では同じヒントを表示）
+    now = time.time()
+    if now - st.session_state.setdefault('tip_shown_at', now) > TIP_ROTATE_SECONDS:
+        st.session_state.tip_index = (st.session_state.get('tip_index', 0) + 1) % len(TIPS)
+        st.session_state.tip_shown_at = now
     
-    import random
-    tip = random.choice(tips)
-    
-    st.info(tip)
+    st.info(TIPS[st.session_state.setdefault('tip_index', 0)])
 
 def show_footer():
     """フッターを表示"""
     
-    st.markdown("---")
     st.markdown("""
+    ---
+    
     <div class="footer">
         <p><strong>A4図面解析システム</strong> v1.0 | © 2024 Your Company</p>
         <p>
@@ -424,9 +480,7 @@ def load_system_stats():
     
     try:
         if st.session_state.config:
-            from src.utils.database import DatabaseManager
-            db_manager = DatabaseManager(st.session_state.config.get('database.path'))
-            stats = db_manager.get_analysis_statistics()
+            stats = load_analysis_statistics(st.session_state.config.get('database.path'))
             
             if stats:
                 st.session_state.system_stats.update({
@@ -447,12 +501,12 @@ def load_system_stats():
 def main():
     """メインアプリケーション"""
     
+    # カスタムCSS（内容が同じ間はフロントエンド側で再描画されない）
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+    
     # セッション状態初期化
     initialize_session_state()
     
-    # システム統計読み込み
-    load_system_stats()
-    
     # ヘッダー表示
     show_header()
     
@@ -465,14 +519,8 @@ def main():
     
     # メインコンテンツ
     try:
-        if selected_page == "図面解析":
-            analysis.show()
-        elif selected_page == "テンプレート管理":
-            templates.show()
-        elif selected_page == "バッチ処理":
-            batch.show()
-        elif selected_page == "システム設定":
-            settings.show()
+        if selected_page in PAGE_MODULES:
+            importlib.import_module(PAGE_MODULES[selected_page]).show()
         else:
             st.error(f"不明なページ: {selected_page}")
     
@@ -6,6 +6,15 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 import logging
 
+# libyamlのC実装が利用可能なら使用
+try:
+    from yaml import CSafeDumper as YamlDumper, CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeDumper as YamlDumper, SafeLoader as YamlLoader
+
+# 設定値が存在しないことを表す番兵
+_MISSING = object()
+
 class SystemConfig:
     """システム設定管理クラス"""
     
@@ -78,10 +87,12 @@ class SystemConfig:
         }
     }
     
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", config_data: Optional[Dict[str, Any]] = None):
         self.config_path = Path(config_path)
         self.logger = logging.getLogger(__name__)
-        self.config = self._load_config()
+        # 読み込み済みの設定が渡された場合はファイルを読み直さない
+        self.config = config_data if config_data is not None else self._load_config()
+        self._get_cache: Dict[str, Any] = {}
     
     def _load_config(self) -> Dict[str, Any]:
         """設定ファイルを読み込み"""
@@ -92,7 +103,7 @@ class SystemConfig:
         
         try:
             with open(self.config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=YamlLoader)
             
             # デフォルト設定とマージ
             merged_config = self._merge_configs(self.DEFAULT_CONFIG, config)
@@ -122,7 +133,7 @@ class SystemConfig:
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
             
             with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(self.DEFAULT_CONFIG, f, default_flow_style=False, 
+                yaml.dump(self.DEFAULT_CONFIG, f, Dumper=YamlDumper, default_flow_style=False,
                          allow_unicode=True, indent=2)
             
             self.logger.info(f"デフォルト設定ファイルを作成しました: {self.config_path}")
@@ -131,22 +142,32 @@ class SystemConfig:
             self.logger.error(f"設定ファイル作成エラー: {e}")
     
     def get(self, key_path: str, default: Any = None) -> Any:
-        """設定値を取得（ドット記法対応）"""
-        keys = key_path.split('.')
+        """設定値を取得（ドット記法対応・解決結果はset/saveまで再利用）"""
+        try:
+            value = self._get_cache[key_path]
+        except KeyError:
+            value = self._get_cache[key_path] = self._resolve(key_path)
+        
+        return default if value is _MISSING else value
+    
+    def _resolve(self, key_path: str) -> Any:
+        """ドット記法のキーを辿って設定値を取得（存在しない場合は_MISSING）"""
         value = self.config
         
-        try:
-            for key in keys:
-                if isinstance(value, dict) and key in value:
-                    value = value[key]
-                else:
-                    return default
-            return value
-        except Exception:
-            return default
+        for key in key_path.split('.'):
+            if isinstance(value, dict) and key in value:
+                value = value[key]
+            else:
+                return _MISSING
+        return value
+    
+    def snapshot(self, defaults: Dict[str, Any]) -> Dict[str, Any]:
+        """複数の設定値をまとめて取得（ドット記法のキーと既定値の辞書を指定）"""
+        return {key_path: self.get(key_path, default) for key_path, default in defaults.items()}
     
     def set(self, key_path: str, value: Any):
         """設定値を設定"""
+        self._get_cache.clear()
         keys = key_path.split('.')
         config_ref = self.config
         
@@ -166,9 +187,11 @@ class SystemConfig:
     
     def save(self):
         """設定ファイルを保存"""
+        # self.configが直接変更された場合に備えて解決済みの値を破棄
+        self._get_cache.clear()
         try:
             with open(self.config_path, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, default_flow_style=False,
+                yaml.dump(self.config, f, Dumper=YamlDumper, default_flow_style=False,
                          allow_unicode=True, indent=2)
             self.logger.info("設定ファイルを保存しました")
         except Exception as e:
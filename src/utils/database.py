@@ -3,13 +3,19 @@
 import sqlite3
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 
 class DatabaseManager:
     """データベース管理クラス"""
     
+    # 管理対象テーブル
+    TABLES = ('analysis_results', 'templates', 'learning_data', 'batch_results', 'system_metrics')
+    
+    # この行数以上のテーブルはsqlite_stat1の統計値を件数として使用
+    STAT_ROW_COUNT_THRESHOLD = 100_000
+    
     def __init__(self, database_path: str):
         self.database_path = database_path
         self.logger = logging.getLogger(__name__)
@@ -27,6 +33,9 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
+                # WALモード（DBファイルに保存されるため初期化時に一度だけ設定）
+                cursor.execute("PRAGMA journal_mode=WAL")
+                
                 # 解析結果テーブル
                 cursor.execute("""
                 CREATE TABLE IF NOT EXISTS analysis_results (
@@ -52,11 +61,19 @@ class DatabaseManager:
                     fields TEXT NOT NULL,
                     layout_features TEXT,
                     confidence_threshold REAL DEFAULT 0.7,
+                    field_count INTEGER NOT NULL DEFAULT 0,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
                 """)
                 
+                # 既存DBにはフィールド数の列を追加し、fieldsから値を埋める
+                # （fieldsは画面作成時は配列、学習更新後は名前をキーとするオブジェクト）
+                cursor.execute("PRAGMA table_info(templates)")
+                if 'field_count' not in {row[1] for row in cursor.fetchall()}:
+                    cursor.execute("ALTER TABLE templates ADD COLUMN field_count INTEGER NOT NULL DEFAULT 0")
+                    cursor.execute("UPDATE templates SET field_count = (SELECT COUNT(*) FROM json_each(templates.fields))")
+                
                 # 学習データテーブル
                 cursor.execute("""
                 CREATE TABLE IF NOT EXISTS learning_data (
@@ -100,7 +117,25 @@ class DatabaseManager:
     
     def get_connection(self) -> sqlite3.Connection:
         """データベース接続を取得"""
-        return sqlite3.connect(self.database_path)
+        conn = sqlite3.connect(self.database_path)
+        
+        # WALモードではNORMALでも整合性は保たれる（コミット毎のfsyncを省略）
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        
+        return conn
+    
+    def get_modified_time(self) -> Optional[float]:
+        """データベースの最終更新時刻を取得（未チェックポイントのWALファイルも考慮）"""
+        
+        mtimes = []
+        for path in (self.database_path, f"{self.database_path}-wal"):
+            try:
+                mtimes.append(Path(path).stat().st_mtime)
+            except FileNotFoundError:
+                pass
+        
+        return max(mtimes) if mtimes else None
     
     def save_analysis_result(self, result_data: Dict[str, Any]) -> Optional[int]:
         """解析結果を保存"""
@@ -151,6 +186,40 @@ class DatabaseManager:
             self.logger.error(f"学習データ保存エラー: {e}")
             raise
     
+    def create_templates(self, templates: List[Dict[str, Any]]) -> int:
+        """テンプレートを一括作成（1回の接続・コミットで挿入）"""
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.executemany("""
+                INSERT INTO templates (
+                    template_id, template_name, product_type, orientation,
+                    fields, field_count, layout_features, confidence_threshold
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        template['template_id'],
+                        template['template_name'],
+                        template['product_type'],
+                        template['orientation'],
+                        json.dumps(template['fields']),
+                        len(template['fields']),
+                        json.dumps(template['layout_features']) if template.get('layout_features') else None,
+                        template.get('confidence_threshold', 0.7)
+                    )
+                    for template in templates
+                ])
+                
+                conn.commit()
+                
+                return cursor.rowcount
+        
+        except Exception as e:
+            self.logger.error(f"テンプレート作成エラー: {e}")
+            raise
+    
     def get_template(self, template_id: str) -> Optional[Dict[str, Any]]:
         """テンプレートを取得"""
         
@@ -193,14 +262,14 @@ class DatabaseManager:
                 if product_type:
                     cursor.execute("""
                     SELECT template_id, template_name, product_type, orientation,
-                           fields, layout_features, confidence_threshold
+                           fields, layout_features, confidence_threshold, field_count
                     FROM templates
                     WHERE product_type = ?
                     """, (product_type,))
                 else:
                     cursor.execute("""
                     SELECT template_id, template_name, product_type, orientation,
-                           fields, layout_features, confidence_threshold
+                           fields, layout_features, confidence_threshold, field_count
                     FROM templates
                     """)
                 
@@ -213,7 +282,8 @@ class DatabaseManager:
                         'orientation': row[3],
                         'fields': json.loads(row[4]),
                         'layout_features': json.loads(row[5]) if row[5] else None,
-                        'confidence_threshold': row[6]
+                        'confidence_threshold': row[6],
+                        'field_count': row[7]
                     })
                 
                 return templates
@@ -222,6 +292,86 @@ class DatabaseManager:
             self.logger.error(f"テンプレート取得エラー: {e}")
             raise
     
+    def get_template_summaries(self, product_type: Optional[str]) -> List[Dict[str, Any]]:
+        """製品タイプ別のテンプレート概要を取得（fields等のJSON列は読み込まない）"""
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                if product_type:
+                    cursor.execute("""
+                    SELECT template_id, template_name, product_type, orientation,
+                           confidence_threshold, field_count
+                    FROM templates
+                    WHERE product_type = ?
+                    """, (product_type,))
+                else:
+                    cursor.execute("""
+                    SELECT template_id, template_name, product_type, orientation,
+                           confidence_threshold, field_count
+                    FROM templates
+                    """)
+                
+                return [
+                    {
+                        'template_id': row[0],
+                        'template_name': row[1],
+                        'product_type': row[2],
+                        'orientation': row[3],
+                        'confidence_threshold': row[4],
+                        'field_count': row[5]
+                    }
+                    for row in cursor.fetchall()
+                ]
+        
+        except Exception as e:
+            self.logger.error(f"テンプレート概要取得エラー: {e}")
+            raise
+    
+    def get_distinct_product_types(self) -> List[str]:
+        """テンプレートに登録されている製品タイプの一覧を取得"""
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                SELECT DISTINCT product_type
+                FROM templates
+                ORDER BY product_type
+                """)
+                
+                return [row[0] for row in cursor.fetchall()]
+        
+        except Exception as e:
+            self.logger.error(f"製品タイプ取得エラー: {e}")
+            raise
+    
+    def get_template_statistics(self) -> List[Dict[str, Any]]:
+        """製品タイプ別のテンプレート数と平均フィールド数を取得"""
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                SELECT product_type, COUNT(*) as template_count,
+                       AVG(field_count) as avg_fields
+                FROM templates
+                GROUP BY product_type
+                ORDER BY template_count DESC
+                """)
+                
+                return [
+                    {'product_type': row[0], 'template_count': row[1], 'avg_fields': row[2]}
+                    for row in cursor.fetchall()
+                ]
+        
+        except Exception as e:
+            self.logger.error(f"テンプレート統計取得エラー: {e}")
+            raise
+    
     def update_template(self, template_id: str, template_data: Dict[str, Any]):
         """テンプレートを更新"""
         
@@ -232,12 +382,14 @@ class DatabaseManager:
                 cursor.execute("""
                 UPDATE templates
                 SET fields = ?,
+                    field_count = ?,
                     layout_features = ?,
                     confidence_threshold = ?,
                     updated_at = CURRENT_TIMESTAMP
                 WHERE template_id = ?
                 """, (
                     json.dumps(template_data['fields']),
+                    len(template_data['fields']),
                     json.dumps(template_data.get('layout_features')),
                     template_data.get('confidence_threshold', 0.7),
                     template_id
@@ -249,6 +401,47 @@ class DatabaseManager:
             self.logger.error(f"テンプレート更新エラー: {e}")
             raise
     
+    def delete_template(self, template_id: str, force: bool = False) -> Tuple[bool, int]:
+        """テンプレートを削除（使用中の場合はforce=Trueのときのみ削除）
+        
+        使用件数の確認と削除は同じ書き込みトランザクションで行う。
+        
+        Returns:
+            (削除したかどうか, 使用件数)
+        """
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                # 件数確認から削除までを同じ書き込みトランザクションで行う
+                cursor.execute("BEGIN IMMEDIATE")
+                
+                # 使用状況確認
+                cursor.execute("""
+                SELECT COUNT(*) FROM analysis_results
+                WHERE template_id = ?
+                """, (template_id,))
+                
+                usage_count = cursor.fetchone()[0]
+                
+                # 未使用または強制指定の場合のみ削除
+                deleted = False
+                if force or usage_count == 0:
+                    cursor.execute("""
+                    DELETE FROM templates
+                    WHERE template_id = ?
+                    """, (template_id,))
+                    deleted = cursor.rowcount > 0
+                
+                conn.commit()
+                
+                return deleted, usage_count
+        
+        except Exception as e:
+            self.logger.error(f"テンプレート削除エラー: {e}")
+            raise
+    
     def get_batch_history(self, limit: int = 100) -> List[Dict[str, Any]]:
         """バッチ処理履歴を取得"""
         
@@ -420,30 +613,56 @@ class DatabaseManager:
         """データベース情報を取得"""
         
         try:
+            db_path = Path(self.database_path)
+            db_stat = db_path.stat() if db_path.exists() else None
+            mtime = self.get_modified_time() if db_stat else None
+            
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # データベースファイルサイズ
-                db_path = Path(self.database_path)
-                size_mb = db_path.stat().st_size / (1024 * 1024) if db_path.exists() else 0
+                size_mb = db_stat.st_size / (1024 * 1024) if db_stat else 0
                 
                 # テーブル別レコード数
-                table_counts = {}
-                for table in ['analysis_results', 'templates', 'learning_data', 'batch_results', 'system_metrics']:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                    table_counts[table] = cursor.fetchone()[0]
+                table_counts = self._get_table_counts(cursor)
                 
                 return {
-                    'exists': db_path.exists(),
+                    'exists': db_stat is not None,
                     'size_mb': size_mb,
                     'table_counts': table_counts,
-                    'last_modified': datetime.fromtimestamp(db_path.stat().st_mtime).isoformat() if db_path.exists() else None
+                    'last_modified': datetime.fromtimestamp(mtime).isoformat() if db_stat else None
                 }
         
         except Exception as e:
             self.logger.error(f"データベース情報取得エラー: {e}")
             raise
     
+    def _get_table_counts(self, cursor: sqlite3.Cursor) -> Dict[str, int]:
+        """テーブル別レコード数を取得
+        
+        ANALYZE済みでsqlite_stat1の行数がSTAT_ROW_COUNT_THRESHOLD以上のテーブルは
+        統計情報の行数（概算）を使用し、それ以外はCOUNT(*)で正確に数える。
+        """
+        
+        stat_counts = {}
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        if cursor.fetchone():
+            cursor.execute("SELECT tbl, stat FROM sqlite_stat1")
+            for table, stat in cursor.fetchall():
+                if stat:
+                    stat_counts[table] = max(stat_counts.get(table, 0), int(stat.split()[0]))
+        
+        table_counts = {}
+        for table in self.TABLES:
+            estimated = stat_counts.get(table, 0)
+            if estimated >= self.STAT_ROW_COUNT_THRESHOLD:
+                table_counts[table] = estimated
+            else:
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                table_counts[table] = cursor.fetchone()[0]
+        
+        return table_counts
+    
     def get_analysis_statistics(self) -> Dict[str, Any]:
         """解析統計情報を取得"""
         
@@ -556,6 +775,8 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 conn.execute("VACUUM")
+                # 最適化後の統計情報を更新（レコード数の概算にも使用）
+                conn.execute("ANALYZE")
         
         except Exception as e:
             self.logger.error(f"データベース最適化エラー: {e}")
@@ -625,6 +846,10 @@ class DatabaseManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_path = backup_dir / f"{db_path.stem}_{timestamp}.db"
             
+            # WALの内容をDBファイルに反映してからコピー
+            with self.get_connection() as conn:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            
             # データベースファイルをコピー
             shutil.copy2(db_path, backup_path)
             
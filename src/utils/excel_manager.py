@@ -93,19 +93,8 @@ class ExcelManager:
                 output_path = self.template_dir.parent / "excel_output" / filename
                 output_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # ワークブック作成
-            wb = openpyxl.Workbook()
-            
-            # シート1: 解析結果
-            self._create_results_sheet(wb, analysis_result)
-            
-            # シート2: メタデータ
-            self._create_metadata_sheet(wb, analysis_result)
-            
-            # シート3: 品質評価
-            self._create_quality_sheet(wb, analysis_result)
-            
-            # 保存
+            # ワークブック作成・保存
+            wb = self._build_analysis_workbook(analysis_result)
             wb.save(output_path)
             
             self.logger.info(f"エクセルレポート作成完了: {output_path}")
@@ -115,6 +104,43 @@ class ExcelManager:
             self.logger.error(f"エクセルレポート作成エラー: {e}")
             raise
     
+    def create_analysis_report_bytes(self, analysis_result: AnalysisResult) -> bytes:
+        """解析結果からエクセルレポートをメモリ上に作成
+        
+        Args:
+            analysis_result: 解析結果
+            
+        Returns:
+            bytes: xlsxファイルの内容
+        """
+        try:
+            wb = self._build_analysis_workbook(analysis_result)
+            buffer = io.BytesIO()
+            wb.save(buffer)
+            
+            self.logger.info(f"エクセルレポート作成完了: {analysis_result.result_id}")
+            return buffer.getvalue()
+            
+        except Exception as e:
+            self.logger.error(f"エクセルレポート作成エラー: {e}")
+            raise
+    
+    def _build_analysis_workbook(self, analysis_result: AnalysisResult) -> openpyxl.Workbook:
+        """解析レポートのワークブックを作成"""
+        
+        wb = openpyxl.Workbook()
+        
+        # シート1: 解析結果
+        self._create_results_sheet(wb, analysis_result)
+        
+        # シート2: メタデータ
+        self._create_metadata_sheet(wb, analysis_result)
+        
+        # シート3: 品質評価
+        self._create_quality_sheet(wb, analysis_result)
+        
+        return wb
+    
     def _create_results_sheet(self, workbook: openpyxl.Workbook, analysis_result: AnalysisResult):
         """解析結果シートを作成"""
         
@@ -1,6 +1,7 @@
 # src/utils/file_handler.py
 
 import json
+import os
 import pandas as pd
 from pathlib import Path
 from typing import Dict, Any, Union, List
@@ -121,11 +122,13 @@ class FileHandler:
             if not directory.exists():
                 raise FileNotFoundError(f"ディレクトリが見つかりません: {directory}")
             
-            files = []
-            for ext in extensions:
-                # 小文字と大文字の両方を検索
-                files.extend(directory.glob(f"*{ext.lower()}"))
-                files.extend(directory.glob(f"*{ext.upper()}"))
+            # 拡張子は小文字に揃えて1回の走査で判定（大文字・小文字の重複走査をしない）
+            suffixes = tuple(ext.lower() for ext in extensions)
+            with os.scandir(directory) as it:
+                files = [
+                    Path(entry.path) for entry in it
+                    if entry.is_file() and entry.name.lower().endswith(suffixes)
+                ]
             
             return sorted(files)
         
@@ -58,9 +58,9 @@ def ensure_float32(image: NDArray[Any]) -> NDFloatType:
 
 
 @contextlib.contextmanager
-def temporary_path(suffix: str = '') -> Generator[Path, None, None]:
+def temporary_path(suffix: str = '', directory: Optional[Path] = None) -> Generator[Path, None, None]:
     """一時ファイルを安全に管理するコンテキストマネージャー"""
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, dir=directory)
     try:
         temp_file.close()
         yield Path(temp_file.name)
@@ -199,8 +199,8 @@ class A4ImageProcessor:
             resized_uint8 = ensure_uint8(resized)
             enhanced = self._enhance_image(resized_uint8)
             
-            # 一時ファイルに保存
-            with temporary_path(suffix=Path(file_path).suffix) as temp_path:
+            # 出力先と同じディレクトリの一時ファイルに保存（rename がファイルシステムをまたがないように）
+            with temporary_path(suffix=Path(file_path).suffix, directory=Path(file_path).parent) as temp_path:
                 cv2.imwrite(str(temp_path), enhanced)
                 
                 # 元のファイルと同じディレクトリに最適化ファイルをコピー
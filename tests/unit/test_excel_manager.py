@@ -10,6 +10,7 @@ Excel出力機能の要件：
 import pytest
 from pathlib import Path
 import tempfile
+import io
 import pandas as pd
 from openpyxl import load_workbook
 from datetime import datetime
@@ -251,6 +252,19 @@ class TestExcelManager:
         assert "平均信頼度" in df_stats["項目"].values
         assert "処理時間" in df_stats["項目"].values
     
+    def test_解析レポートのメモリ出力(self, excel_manager, sample_analysis_result):
+        """解析レポートをファイルを介さずbytesで出力するテスト"""
+        # When
+        report_bytes = excel_manager.create_analysis_report_bytes(sample_analysis_result)
+        
+        # Then
+        wb = load_workbook(io.BytesIO(report_bytes))
+        assert wb.sheetnames[:2] == ["解析結果", "メタデータ"]
+        
+        df = pd.read_excel(io.BytesIO(report_bytes), sheet_name="解析結果")
+        assert "部品番号" in df["フィールド名"].values
+        assert "A-123" in df["抽出値"].values
+    
     @staticmethod
     def _create_test_template(template_path: Path):
         """テスト用のテンプレートファイルを作成"""
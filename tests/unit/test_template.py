@@ -0,0 +1,44 @@
+"""図面テンプレートモデルのユニットテスト
+
+テンプレートの要件：
+- 必須フィールドの欠落・空値を検出
+- フィールドの直接変更後も必須判定が追従
+"""
+import pytest
+
+from src.models.template import DrawingTemplate, TemplateField
+from src.models.drawing import DrawingOrientation, ProductType
+from src.models.analysis_result import FieldType
+
+
+class TestDrawingTemplate:
+    """DrawingTemplateのユニットテスト"""
+
+    @pytest.fixture
+    def template(self):
+        """テスト用のテンプレート"""
+        return DrawingTemplate(
+            template_id="tpl_test",
+            template_name="テスト",
+            product_type=ProductType.MECHANICAL_PART,
+            orientation=DrawingOrientation.PORTRAIT,
+            fields={
+                "部品番号": TemplateField("部品番号", FieldType.TEXT, is_required=True),
+                "材質": TemplateField("材質", FieldType.TEXT)
+            }
+        )
+
+    def test_必須フィールドの欠落と空値(self, template):
+        """欠落・空文字の必須フィールドがエラーになることを確認"""
+        assert template.validate_extracted_data({"材質": "SUS304"}) == {"部品番号": ["必須フィールドです"]}
+        assert template.validate_extracted_data({"部品番号": " "}) == {"部品番号": ["必須フィールドです"]}
+        assert template.validate_extracted_data({"部品番号": "A-123"}) == {}
+
+    def test_フィールドの直接変更に追従(self, template):
+        """fieldsやis_requiredを直接変更しても必須判定が正しいことを確認"""
+        template.fields["材質"].is_required = True
+        template.fields["図面番号"] = TemplateField("図面番号", FieldType.TEXT, is_required=True)
+        del template.fields["部品番号"]
+
+        assert template.required_field_count == 2
+        assert set(template.validate_extracted_data({})) == {"材質", "図面番号"}